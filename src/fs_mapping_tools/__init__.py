@@ -1,3 +1,5 @@
 from .track.cones import *
 from .vehicle.car import *
 from .vehicle.detection import *
+from .vehicle.dynamics import *
+from .vehicle.fleet import *
@@ -4,15 +4,57 @@ Author:
     Paulo Sanchez (@erlete)
 """
 
-from typing import Any, List, Sequence, Union
+from __future__ import annotations
+
+from enum import IntEnum
+from itertools import compress
+from math import floor
+from typing import Any, List, Optional, Sequence, Tuple, Union
 
 import matplotlib
+import numpy as np
 from bidimensional import Coordinate
 from matplotlib import pyplot as plt
 
 from ..config import CONES
 
 
+class ConeType(IntEnum):
+    """Cone type enumeration.
+
+    This class enumerates the four types of cones defined in the FS rules,
+    allowing them to be tagged and compared as integers. The name of the type
+    in the configuration can be obtained through the `label` property.
+    """
+
+    YELLOW = 0
+    ORANGE = 1
+    ORANGE_BIG = 2
+    BLUE = 3
+
+    @property
+    def label(self) -> str:
+        """Get the name of the cone type.
+
+        Returns:
+            str: name of the cone type, as used in the configuration.
+        """
+        return self.name.lower().replace('_', '-')
+
+
+# Cone types by name:
+_TYPES = {type_.label: type_ for type_ in ConeType}
+
+# Plotting layers of each type of cone, as (color, marker size) pairs:
+_STYLES: Tuple[Tuple[Tuple[str, float], ...], ...] = tuple(
+    tuple(
+        (style["colors"][layer], style["size"][layer])
+        for layer in ("base", "strip_low", "mid", "strip_high", "top")
+    ) + (("#ffffff", style["size"]["top"] / 2),)
+    for style in (CONES[type_.label] for type_ in ConeType)
+)
+
+
 class Cone:
     """Cone representation class.
 
@@ -26,20 +68,31 @@ class Cone:
         position (Coordinate): coordinate representing the cone's position.
         type (str): type of cone. Must be one of the following: "yellow",
             "orange", "orange-big" or "blue".
+        kind (ConeType): type of cone, as an integer enumeration member.
+
+    Note:
+        The x and y coordinates are cached when the position is set, so the
+        position must be replaced (not modified in place) to move the cone.
     """
 
-    def __init__(self, position: Coordinate, type: str) -> None:
+    __slots__ = ("_position", "_x", "_y", "_type", "_kind", "_style", "_hash")
+
+    # Number of times any cone has been moved, used by cone arrays to detect
+    # that their position buffers might be outdated:
+    _moves = 0
+
+    def __init__(self, position: Coordinate,
+                 type: Union[str, ConeType]) -> None:
         """Initialize a cone instance.
 
         Args:
             position (Coordinate): coordinate representing the cone's
                 position.
-            type (str): type of cone. Must be one of the following: "yellow",
-                "orange", "orange-big" or "blue".
+            type (str | ConeType): type of cone. Must be one of the following:
+                "yellow", "orange", "orange-big" or "blue", or the matching
+                `ConeType` member.
         """
         self.position = position
-        self._x = position[0]
-        self._y = position[1]
         self.type = type
 
     @property
@@ -49,7 +102,7 @@ class Cone:
         Returns:
             float: x coordinate of the cone.
         """
-        return self.position.x
+        return self._x
 
     @property
     def y(self) -> float:
@@ -58,7 +111,7 @@ class Cone:
         Returns:
             float: y coordinate of the cone.
         """
-        return self.position.y
+        return self._y
 
     @property
     def position(self) -> Coordinate:
@@ -83,7 +136,13 @@ class Cone:
         if not isinstance(position, Coordinate):
             raise TypeError("position must be a Coordinate")
 
+        if hasattr(self, "_position"):
+            Cone._moves += 1
+
         self._position = position
+        self._x = position.x
+        self._y = position.y
+        self._hash = None
 
     @property
     def type(self) -> str:
@@ -95,71 +154,62 @@ class Cone:
         return self._type
 
     @type.setter
-    def type(self, value: str) -> None:
+    def type(self, value: Union[str, ConeType]) -> None:
         """Set the type of cone.
 
         Args:
-            value (str): type of cone. Must be one of the following: "yellow",
-                "orange", "orange-big" or "blue".
+            value (str | ConeType): type of cone. Must be one of the following:
+                "yellow", "orange", "orange-big" or "blue", or the matching
+                `ConeType` member.
 
         Raises:
-            TypeError: if `value` is not a string.
+            TypeError: if `value` is not a string or a `ConeType` member.
             ValueError: if `value` is not one of the allowed cone types.
         """
-        if not isinstance(value, str):
-            raise TypeError("value must be a string")
+        if isinstance(value, ConeType):
+            kind = value
 
-        elif value not in CONES:
+        elif not isinstance(value, str):
+            raise TypeError("value must be a string or a ConeType member")
+
+        elif value not in _TYPES:
             raise ValueError(
                 "value must be one of the following types: "
                 + ', '.join(f"\"{key}\"" for key in list(CONES.keys())[:-1])
                 + f" or \"{list(CONES.keys())[-1]}\""
             )
 
-        self._type = value
+        else:
+            kind = _TYPES[value]
+
+        self._type = kind.label
+        self._kind = kind
+        self._style = _STYLES[kind]
+        self._hash = None
+
+    @property
+    def kind(self) -> ConeType:
+        """Get the type of cone as an integer enumeration member.
+
+        Returns:
+            ConeType: type of cone.
+        """
+        return self._kind
 
-    def plot(self, ax: matplotlib.axes.Axes = plt.gca(),
+    def plot(self, ax: matplotlib.axes.Axes = None,
              detail: bool = False) -> None:
         """Plot the cone in a `matplotlib` figure.
 
         Args:
             ax (matplotlib.axes.Axes, optional): the ax to plot the cone in.
-                Defaults to plt.gca().
+                Defaults to None. If None, plt.gca() is used.
             detail (bool, optional): whether to plot all the details of the
                 cone (can affect performance). Defaults to False.
         """
-        ax.plot(
-            self.position.x, self.position.y,
-            color=CONES[self.type]["colors"]["base"],
-            marker='o', ms=CONES[self.type]["size"]["base"]
-        )
+        ax = ax if ax is not None else plt.gca()
 
-        if detail:
-            ax.plot(
-                self.position.x, self.position.y,
-                color=CONES[self.type]["colors"]["strip_low"],
-                marker='o', ms=CONES[self.type]["size"]["strip_low"]
-            )
-            ax.plot(
-                self.position.x, self.position.y,
-                color=CONES[self.type]["colors"]["mid"],
-                marker='o', ms=CONES[self.type]["size"]["mid"]
-            )
-            ax.plot(
-                self.position.x, self.position.y,
-                color=CONES[self.type]["colors"]["strip_high"],
-                marker='o', ms=CONES[self.type]["size"]["strip_high"]
-            )
-            ax.plot(
-                self.position.x, self.position.y,
-                color=CONES[self.type]["colors"]["top"],
-                marker='o', ms=CONES[self.type]["size"]["top"]
-            )
-            ax.plot(
-                self.position.x, self.position.y,
-                color="#ffffff",
-                marker='o', ms=CONES[self.type]["size"]["top"] / 2
-            )
+        for color, size in (self._style if detail else self._style[:1]):
+            ax.plot(self._x, self._y, color=color, marker='o', ms=size)
 
     def __eq__(self, other: object) -> bool:
         """Check if two cones are equal.
@@ -173,7 +223,11 @@ class Cone:
         if not isinstance(other, Cone):
             raise TypeError("can only compare Cone instances")
 
-        return self.position == other.position and self.type == other.type
+        return (
+            self._x == other._x
+            and self._y == other._y
+            and self._kind == other._kind
+        )
 
     def __ne__(self, other: object) -> bool:
         """Check if two cones are not equal.
@@ -191,8 +245,14 @@ class Cone:
 
         Returns:
             int: hash of the cone.
+
+        Note:
+            The hash is cached until the position or type of the cone change.
         """
-        return hash((self.position, self.type))
+        if self._hash is None:
+            self._hash = hash((self._x, self._y, self._kind))
+
+        return self._hash
 
     def __repr__(self) -> str:
         """Get the raw representation of the cone.
@@ -200,7 +260,7 @@ class Cone:
         Returns:
             str: raw representation of the cone.
         """
-        return f"Cone({self.position.x}, {self.position.y}, {self.type})"
+        return f"Cone({self._x}, {self._y}, {self._type})"
 
     def __str__(self) -> str:
         """Get the string representation of the cone.
@@ -208,7 +268,7 @@ class Cone:
         Returns:
             str: string representation of the cone.
         """
-        return f"Cone({self.position.x}, {self.position.y}, {self.type})"
+        return f"Cone({self._x}, {self._y}, {self._type})"
 
 
 class ConeArray(Sequence):
@@ -218,10 +278,18 @@ class ConeArray(Sequence):
     of the four types of cones defined in the FS rules: "yellow", "orange",
     "orange-big" and "blue", but all cones must be of the same type.
 
+    Cone positions are also stored in a contiguous `(N, 2)` array, so that
+    geometric queries over the whole array can be vectorized instead of
+    iterating over each `Cone` instance.
+
     Attributes:
-        cones (Tuple[Cone]): tuple of cones in the array.
+        cones (Tuple[Cone, ...]): cones in the array.
+        positions (np.ndarray): `(N, 2)` array with the positions of the
+            cones in the array.
         type (str): type of cones in the array. Must be one of the following:
             "yellow", "orange", "orange-big" or "blue".
+        kind (ConeType): type of cones in the array, as an integer
+            enumeration member.
     """
 
     def __init__(self, *cones: Cone) -> None:
@@ -233,13 +301,14 @@ class ConeArray(Sequence):
         self.cones = list(cones)
 
     @property
-    def cones(self) -> List[Cone]:
+    def cones(self) -> Tuple[Cone, ...]:
         """Get the cones in the array.
 
         Returns:
-            List[Cone]: list of cones in the array.
+            Tuple[Cone, ...]: cones in the array. The array is modified with
+                `append`, `extend`, item assignment or the `cones` setter.
         """
-        return self._cones
+        return tuple(self._cones)
 
     @cones.setter
     def cones(self, cones: List[Cone]) -> None:
@@ -254,18 +323,23 @@ class ConeArray(Sequence):
             TypeError: if any element in `cones` is not a `Cone` instance.
             ValueError: if `cones` is not of the same type.
         """
-        if not isinstance(cones, (tuple, list, set)):
-            raise TypeError("cones must be a tuple, list or set")
+        self._validate(cones)
 
-        if not all(isinstance(cone, Cone) for cone in cones):
-            raise TypeError(
-                "all elements in the iterable sequence must be Cone instances"
-            )
+        self._cones = list(cones)
+        self._positions = None
 
-        if len(set(cone.type for cone in cones)) > 1:
-            raise ValueError("all cones must be of the same type")
+    @property
+    def positions(self) -> np.ndarray:
+        """Get the positions of the cones in the array.
+
+        Returns:
+            np.ndarray: read-only `(N, 2)` double precision array with the
+                positions of the cones in the array.
+        """
+        if self._positions is None or self._moves != Cone._moves:
+            self._update_positions()
 
-        self._cones = cones
+        return self._positions
 
     @property
     def type(self) -> str:
@@ -274,7 +348,16 @@ class ConeArray(Sequence):
         Returns:
             str: type of cones in the array.
         """
-        return self.cones[0].type if self.cones else None
+        return self._cones[0].type if self._cones else None
+
+    @property
+    def kind(self) -> Optional[ConeType]:
+        """Get the type of cones in the array as an integer enumeration member.
+
+        Returns:
+            ConeType: type of cones in the array.
+        """
+        return self._cones[0].kind if self._cones else None
 
     def append(self, cone: Cone) -> None:
         """Append a cone to the array.
@@ -290,12 +373,13 @@ class ConeArray(Sequence):
         if not isinstance(cone, Cone):
             raise TypeError("cone must be a Cone instance", type(cone))
 
-        if cone.type != self.type:
+        if cone.kind != self.kind:
             raise ValueError(
                 "cone must be of the same type as the cones in the array"
             )
 
         self._cones.append(cone)
+        self._positions = None
 
     def extend(self, cones: List[Cone]) -> None:
         """Extend the array with a list of cones.
@@ -310,35 +394,201 @@ class ConeArray(Sequence):
             ValueError: if `cones` is not of the same type as the cones in the
                 array.
         """
-        if not isinstance(cones, (tuple, list, set)):
-            raise TypeError("cones must be a tuple, list or set")
-
-        if not all(isinstance(cone, Cone) for cone in cones):
-            raise TypeError(
-                "all elements in the iterable sequence must be Cone instances"
-            )
+        kind = self._validate(cones)
 
-        if len(set(cone.type for cone in cones)) > 1:
-            raise ValueError("all cones must be of the same type")
+        if not cones:
+            return
 
-        if cones[0].type != self.type:
+        if kind != self.kind:
             raise ValueError("cones must be of the same type as the cones in "
                              "the array")
 
         self._cones.extend(cones)
+        self._positions = None
 
-    def plot(self, ax: matplotlib.axes.Axes = plt.gca(),
-             detail: bool = False) -> None:
+    def select(self, mask: np.ndarray) -> ConeArray:
+        """Get a new array with the cones selected by a boolean mask.
+
+        Since the selected cones are already known to be valid, they are not
+        validated again, and their positions are taken from the positions
+        buffer of the array instead of being read from each cone.
+
+        Args:
+            mask (np.ndarray): boolean mask with a True value for each cone
+                of the array to be selected.
+
+        Returns:
+            ConeArray: array with the selected cones, in the same order.
+
+        Raises:
+            ValueError: if the mask does not have one value per cone.
+        """
+        mask = np.asarray(mask, dtype=bool)
+
+        if mask.shape != (len(self._cones),):
+            raise ValueError("mask must have one value per cone")
+
+        selection = ConeArray.__new__(ConeArray)
+        selection._cones = list(compress(self._cones, mask))
+        selection._set_positions(self.positions[mask])
+
+        return selection
+
+    def indices_in_box(self, x_low: float, x_high: float,
+                       y_low: float, y_high: float,
+                       cell: Optional[float] = None) -> np.ndarray:
+        """Get the indices of the cones within an axis-aligned box.
+
+        On the first call after the array changes, or with another cell
+        size, the cones are grouped in columns of the given width and sorted
+        by column and y coordinate. Each query then only takes a few binary
+        searches per column the box overlaps. This allows spatial queries
+        over large arrays to skip most cones.
+
+        Args:
+            x_low (float): lower x bound of the box (inclusive).
+            x_high (float): upper x bound of the box (inclusive).
+            y_low (float): lower y bound of the box (inclusive).
+            y_high (float): upper y bound of the box (inclusive).
+            cell (float, optional): width of the grid columns. Defaults to
+                None. If None, the width of the box is used. Repeated queries
+                should pass the same value, so that the grid is reused.
+
+        Returns:
+            np.ndarray: indices of the cones within the box, in order of
+                column and y coordinate.
+        """
+        positions = self.positions
+
+        if x_high < x_low or y_high < y_low:
+            return np.empty(0, dtype=np.intp)
+
+        # Any positive width is valid, but matching the box keeps the number
+        # of columns to search low:
+        width = cell if cell is not None else x_high - x_low
+        width = width if width > 0 else 1.0
+
+        if self._grid is None or self._grid[0] != width:
+            xs, ys = positions.T
+            columns = np.floor(xs / width).astype(np.int64)
+            order = np.lexsort((ys, columns))
+            self._grid = (width, order, columns[order], xs, ys[order])
+
+        _, order, columns, xs, ys = self._grid
+
+        bounds = np.searchsorted(columns, np.arange(
+            floor(x_low / width), floor(x_high / width) + 2
+        )).tolist()
+
+        indices = []
+        for start, stop in zip(bounds, bounds[1:]):
+            column_ys = ys[start:stop]
+
+            indices.append(order[
+                start + np.searchsorted(column_ys, y_low, side="left"):
+                start + np.searchsorted(column_ys, y_high, side="right")
+            ])
+
+        indices = np.concatenate(indices)
+        candidates = xs[indices]
+
+        return indices[(candidates >= x_low) & (candidates <= x_high)]
+
+    @staticmethod
+    def _validate(cones: Sequence[Cone]) -> Optional[ConeType]:
+        """Validate a sequence of cones.
+
+        All cones are checked in a single pass, which stops at the first
+        invalid one.
+
+        Args:
+            cones (Sequence[Cone]): sequence of cones to validate.
+
+        Returns:
+            ConeType | None: type of the cones, or None if the sequence is
+                empty.
+
+        Raises:
+            TypeError: if `cones` is not a tuple, list or set.
+            TypeError: if any element in `cones` is not a `Cone` instance.
+            ValueError: if `cones` is not of the same type.
+        """
+        if not isinstance(cones, (tuple, list, set)):
+            raise TypeError("cones must be a tuple, list or set")
+
+        kind = None
+        for cone in cones:
+            if not isinstance(cone, Cone):
+                raise TypeError(
+                    "all elements in the iterable sequence must be Cone "
+                    "instances"
+                )
+
+            if kind is None:
+                kind = cone.kind
+
+            elif cone.kind != kind:
+                raise ValueError("all cones must be of the same type")
+
+        return kind
+
+    def _update_positions(self) -> None:
+        """Rebuild the position buffers from the cones in the array.
+
+        The positions are stored in a contiguous `(N, 2)` double precision
+        array, so that they match the coordinates of the cones exactly. The
+        buffer is discarded whenever the cones change and only rebuilt on
+        the next access, so that building an array cone by cone is linear.
+        Since cones do not know the arrays they belong to, moving any cone
+        also makes every array rebuild its buffer on the next access.
+        """
+        self._set_positions(np.fromiter(
+            (value for cone in self._cones for value in (cone.x, cone.y)),
+            dtype=np.float64,
+            count=2 * len(self._cones)
+        ).reshape(-1, 2))
+
+    def _set_positions(self, positions: np.ndarray) -> None:
+        """Set the position buffers of the array.
+
+        Args:
+            positions (np.ndarray): `(N, 2)` array with the positions of the
+                cones in the array. It is made read-only.
+        """
+        self._positions = positions
+        self._positions.flags.writeable = False
+        self._moves = Cone._moves
+        self._grid = None
+
+    def plot(self, ax: matplotlib.axes.Axes = None,
+             detail: bool = False, rasterized: bool = True) -> None:
         """Plot the cones in a `matplotlib` figure.
 
+        All cones are drawn at once, with a single scatter collection per
+        layer of detail.
+
         Args:
             ax (matplotlib.axes.Axes, optional): the ax to plot the cones in.
-                Defaults to plt.gca().
+                Defaults to None. If None, plt.gca() is used.
             detail (bool, optional): whether to plot all the details of the
                 cones (can affect performance). Defaults to False.
+            rasterized (bool, optional): whether to rasterize the cones when
+                the figure is saved to a vector format. Defaults to True.
         """
-        for cone in self.cones:
-            cone.plot(ax=ax, detail=detail)
+        ax = ax if ax is not None else plt.gca()
+
+        if not self._cones:
+            return
+
+        style = _STYLES[self.kind]
+        xs, ys = self.positions.T
+
+        for color, size in (style if detail else style[:1]):
+            ax.scatter(
+                xs, ys,
+                s=size ** 2, color=color,
+                marker='o', rasterized=rasterized
+            )
 
     def __eq__(self, other: object) -> bool:
         """Check if the cone array is equal to another object.
@@ -412,11 +662,12 @@ class ConeArray(Sequence):
         if not isinstance(cone, Cone):
             raise TypeError("cone must be a Cone instance")
 
-        if cone.type != self.type:
+        if cone.kind != self.kind:
             raise ValueError("cone must be of the same type as the cones in "
                              "the array")
 
         self._cones[index] = cone
+        self._positions = None
 
     def __len__(self) -> int:
         """Get the number of cones in the array.
@@ -8,16 +8,51 @@ Authors:
 """
 from __future__ import annotations
 
-from math import cos, pi, sin
-from typing import Optional, Tuple, Union
+from math import cos, sin
+from typing import Dict, Optional, Tuple, Union
 
 import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
 from bidimensional import Coordinate, Segment
-from bidimensional.polygons import Polygon
 
 from ..vehicle.detection import Camera, Lidar
+from ..vehicle.dynamics import STATE_DTYPE
+
+# Speed unit conversion factors:
+_KMH_TO_MS = 1 / 3.6
+_MS_TO_KMH = 3.6
+
+# Interned engine value ranges, shared by all engines with equal ranges:
+_RANGES: Dict[Tuple[float, float], np.ndarray] = {}
+
+
+def _intern_range(
+    value: Tuple[Union[int, float], Union[int, float]]
+) -> np.ndarray:
+    """Get the interned instance of a value range.
+
+    Args:
+        value (Tuple[Union[int, float], Union[int, float]]): value range.
+
+    Returns:
+        np.ndarray: read-only `(2,)` array with the lower and upper bounds
+            of the range.
+
+    Raises:
+        ValueError: if the range does not have two values.
+    """
+    key = tuple(float(bound) for bound in value)
+
+    if len(key) != 2:
+        raise ValueError("ranges must have a lower and an upper bound.")
+
+    if key not in _RANGES:
+        array = np.array(key, dtype=np.float64)
+        array.flags.writeable = False
+        _RANGES[key] = array
+
+    return _RANGES[key]
 
 
 class State:
@@ -42,6 +77,8 @@ class State:
         "speed",
         "acceleration",
         "torque",
+        "_direction",
+        "_direction_orientation",
     )
 
     def __init__(
@@ -77,6 +114,42 @@ class State:
         self.acceleration = acceleration
         self.torque = torque
 
+        self._direction_orientation = None
+
+    @property
+    def direction(self) -> Tuple[float, float]:
+        """Get the unit vector the car is oriented towards.
+
+        The vector is cached until the orientation changes, so that all
+        consumers of the state share a single evaluation of its cosine and
+        sine.
+
+        Returns:
+            Tuple[float, float]: cosine and sine of the orientation.
+        """
+        if self._direction_orientation != self.orientation:
+            self._direction = (cos(self.orientation), sin(self.orientation))
+            self._direction_orientation = self.orientation
+
+        return self._direction
+
+    def as_record(self) -> np.ndarray:
+        """Get the state as a NumPy record.
+
+        Returns:
+            np.ndarray: zero-dimensional array of `STATE_DTYPE` type with
+                the values of the state.
+        """
+        return np.array((
+            self.position.x,
+            self.position.y,
+            self.orientation,
+            self.steering,
+            self.speed,
+            self.acceleration,
+            self.torque
+        ), dtype=STATE_DTYPE)
+
 
 class Wheel:
     """Wheel representation class.
@@ -129,38 +202,33 @@ class Wheel:
         )
         ax = ax if ax is not None else plt.gca()
 
-        wheel = Polygon(
-            Coordinate(
-                cos(orientation + steering) * (self.diameter / 2),
-                sin(orientation + steering) * (self.diameter / 2)
-            ) + center + Coordinate(
-                cos(orientation + (pi / 2) + steering) * (self.width / 2),
-                sin(orientation + (pi / 2) + steering) * (self.width / 2)
-            ),
-            -Coordinate(
-                cos(orientation + steering) * (self.diameter / 2),
-                sin(orientation + steering) * (self.diameter / 2)
-            ) + center + Coordinate(
-                cos(orientation + (pi / 2) + steering) * (self.width / 2),
-                sin(orientation + (pi / 2) + steering) * (self.width / 2)
-            ),
-            -Coordinate(
-                cos(orientation + steering) * (self.diameter / 2),
-                sin(orientation + steering) * (self.diameter / 2)
-            ) + center - Coordinate(
-                cos(orientation + (pi / 2) + steering) * (self.width / 2),
-                sin(orientation + (pi / 2) + steering) * (self.width / 2)
-            ),
-            Coordinate(
-                cos(orientation + steering) * (self.diameter / 2),
-                sin(orientation + steering) * (self.diameter / 2)
-            ) + center - Coordinate(
-                cos(orientation + (pi / 2) + steering) * (self.width / 2),
-                sin(orientation + (pi / 2) + steering) * (self.width / 2)
-            )
+        # Half length (along the wheel) and half width (across it) vectors:
+        cos_w = cos(orientation + steering)
+        sin_w = sin(orientation + steering)
+        length_x = cos_w * (self.diameter / 2)
+        length_y = sin_w * (self.diameter / 2)
+        width_x = -sin_w * (self.width / 2)
+        width_y = cos_w * (self.width / 2)
+
+        # The corners and the outline are drawn with one line each, with the
+        # same styles as the vertices and sides of a polygon:
+        xs = (
+            center.x + length_x + width_x,
+            center.x - length_x + width_x,
+            center.x - length_x - width_x,
+            center.x + length_x - width_x
+        )
+        ys = (
+            center.y + length_y + width_y,
+            center.y - length_y + width_y,
+            center.y - length_y - width_y,
+            center.y + length_y - width_y
         )
 
-        wheel.plot(ax=ax, annotate=False, **kwargs)
+        ax.plot(xs, ys, '.', **{**Coordinate.STYLES, **kwargs})
+        ax.plot(
+            xs + xs[:1], ys + ys[:1], '-', **{**Segment.STYLES, **kwargs}
+        )
 
 
 class Axis:
@@ -213,17 +281,14 @@ class Axis:
         """
         ax = ax if ax is not None else plt.gca()
 
-        main_axis = Segment(
-            Coordinate(
-                cos(state.orientation + pi / 2) * (self.track / 2),
-                sin(state.orientation + pi / 2) * (self.track / 2)
-            ) + center,
-            -Coordinate(
-                cos(state.orientation + pi / 2) * (self.track / 2),
-                sin(state.orientation + pi / 2) * (self.track / 2)
-            ) + center
+        # Perpendicular to the orientation: (cos(o + pi/2), sin(o + pi/2)).
+        cos_o, sin_o = state.direction
+        offset = Coordinate(
+            -sin_o * (self.track / 2), cos_o * (self.track / 2)
         )
 
+        main_axis = Segment(offset + center, -offset + center)
+
         self.left_wheel.plot(state, main_axis.a, self.max_steering,
                              ax=ax, **kwargs)
         self.right_wheel.plot(state, main_axis.b, self.max_steering,
@@ -275,15 +340,13 @@ class Direction:
         """
         ax = ax if ax is not None else plt.gca()
 
+        cos_o, sin_o = state.direction
+        offset = Coordinate(
+            cos_o * self.wheelbase / 2, sin_o * self.wheelbase / 2
+        )
+
         main_axis = Segment(
-            Coordinate(
-                cos(state.orientation) * self.wheelbase / 2,
-                sin(state.orientation) * self.wheelbase / 2
-            ) + state.position,
-            -Coordinate(
-                cos(state.orientation) * self.wheelbase / 2,
-                sin(state.orientation) * self.wheelbase / 2
-            ) + state.position
+            offset + state.position, -offset + state.position
         )
 
         self.front_axis.plot(state, main_axis.a, ax=ax, **kwargs)
@@ -296,15 +359,16 @@ class Engine:
     """Engine representation class.
 
     This class represent the engine of the car. It includes valid value ranges
-    for the acceleration, speed and torque of the car.
+    for the acceleration, speed and torque of the car. Ranges are stored as
+    read-only `(low, high)` arrays, so that they can be used directly in
+    vectorized operations, and interned, so that engines with the same
+    ranges (e.g. in a fleet of identical cars) share them.
 
     Attributes:
-        speed (Tuple[Union[int, float], Union[int, float]]): valid speed range
-            of the car [m/s].
-        acceleration (Tuple[Union[int, float], Union[int, float]]): valid
-            acceleration range of the car [m/s^2].
-        torque (Tuple[Union[int, float], Union[int, float]]): valid torque
-            range of the car [Nm].
+        speed (np.ndarray): valid speed range of the car [m/s].
+        acceleration (np.ndarray): valid acceleration range of the car
+            [m/s^2].
+        torque (np.ndarray): valid torque range of the car [Nm].
     """
 
     __slots__ = ("acceleration", "speed", "torque")
@@ -324,10 +388,24 @@ class Engine:
                 acceleration range of the car [m/s^2].
             torque (Tuple[Union[int, float], Union[int, float]]): valid torque
                 range of the car [Nm].
+
+        Raises:
+            ValueError: if any of the ranges does not have two values.
         """
-        self.speed = speed
-        self.acceleration = acceleration
-        self.torque = torque
+        self.speed = _intern_range(speed)
+        self.acceleration = _intern_range(acceleration)
+        self.torque = _intern_range(torque)
+
+    def clip_speed(self, speed: np.ndarray) -> np.ndarray:
+        """Clip speeds to the valid speed range, in place.
+
+        Args:
+            speed (np.ndarray): speeds to clip [m/s].
+
+        Returns:
+            np.ndarray: the clipped speeds array.
+        """
+        return np.clip(speed, self.speed[0], self.speed[1], out=speed)
 
 
 class Structure:
@@ -444,28 +522,34 @@ class Car:
         self.structure = structure
 
     @staticmethod
-    def kmh_to_ms(speed: Union[int, float]) -> float:
+    def kmh_to_ms(
+        speed: Union[int, float, np.ndarray]
+    ) -> Union[float, np.ndarray]:
         """Convert speed from km/h to m/s.
 
         Args:
-            speed (Union[int, float]): speed in km/h.
+            speed (Union[int, float, np.ndarray]): speed in km/h. Arrays are
+                converted element-wise.
 
         Returns:
-            float: speed in m/s.
+            Union[float, np.ndarray]: speed in m/s.
         """
-        return speed / 3.6
+        return speed * _KMH_TO_MS
 
     @staticmethod
-    def ms_to_kmh(speed: Union[int, float]) -> float:
+    def ms_to_kmh(
+        speed: Union[int, float, np.ndarray]
+    ) -> Union[float, np.ndarray]:
         """Convert speed from m/s to km/h.
 
         Args:
-            speed (Union[int, float]): speed in m/s.
+            speed (Union[int, float, np.ndarray]): speed in m/s. Arrays are
+                converted element-wise.
 
         Returns:
-            float: speed in km/h.
+            Union[float, np.ndarray]: speed in km/h.
         """
-        return speed * 3.6
+        return speed * _MS_TO_KMH
 
     def plot(self, ax: matplotlib.axes.Axes = None, **kwargs) -> None:
         """Plot the car.
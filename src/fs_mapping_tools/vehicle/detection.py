@@ -7,16 +7,22 @@ Authors:
     Paulo Sanchez (@erlete)
 """
 
-from math import cos, sin
-from typing import Any, List, Optional, Union
+from __future__ import annotations
+
+from math import cos, pi, sin
+from typing import Any, Iterable, List, Optional, Tuple, Union
 
 import matplotlib
 import matplotlib.pyplot as plt
+import numpy as np
 from bidimensional import Coordinate
 from bidimensional.polygons import Triangle
 
 from ..track.cones import Cone, ConeArray
 
+# Accepted types of numeric camera properties:
+_NUMBERS = (int, float, np.integer, np.floating)
+
 
 class Camera:
     """Camera representation class.
@@ -34,9 +40,38 @@ class Camera:
 
     __slots__ = (
         "_position", "_orientation", "_fov", "_detection_range",
-        "_detected", "_detection_area", "__ready_to_detect"
+        "_cos_half_fov", "_sin_half_fov",
+        "_detected", "_boundaries", "_coefficients", "_polygons", "_valid",
+        "_half_planes", "_reach", "_detection_area", "_outdated",
+        "_detection_key"
     )
 
+    # Indices of the camera position (0), left boundary (1), right boundary
+    # (2) and radius (3) that make up each detection triangle:
+    _TRIANGLES = np.array(((0, 1, 2), (1, 2, 3)))
+
+    # Indices of the same points, in order along the outline of the area:
+    _OUTLINE = np.array((0, 1, 3, 2))
+
+    # Indices of the points along the outline of the area for fields of view
+    # of pi or wider, where the first triangle lies within the second one:
+    _WIDE_OUTLINE = np.array((1, 3, 2))
+
+    # Number of positions tested at once by batch containment tests:
+    _BLOCK_SIZE = 16384
+
+    # Number of cones of an array above which only those in the bounding box
+    # of the detection range of the camera are checked:
+    _INDEXED = 8192
+
+    # Largest fraction of the positions of a block within the detection range
+    # for which the area is only checked against those positions:
+    _SPARSE = 0.25
+
+    # Plot keyword arguments that are also passed to the detection area fill,
+    # since most line properties (markers, widths...) are not valid for it:
+    _FILL_KWARGS = ("color", "alpha", "zorder")
+
     def __init__(self, position: Optional[Coordinate] = None,
                  orientation: Union[int, float] = 0,
                  fov: Union[int, float] = 0,
@@ -54,15 +89,18 @@ class Camera:
             detection_range (int | float, optional): detection range of the
                 camera. Defaults to 0.
         """
-        self.__ready_to_detect = False
-
-        self.position = position if position is not None else Coordinate(0, 0)
-        self.orientation = orientation
-        self.fov = fov
-        self.detection_range = detection_range
-
-        self.__ready_to_detect = True
-        self._set_detection_area()
+        self._boundaries = np.zeros((4, 2), dtype=np.float64)
+        self._detected = []
+        self._detection_key = None
+        self._orientation = self._fov = self._detection_range = None
+        self._outdated = True
+
+        self.configure(
+            position=position if position is not None else Coordinate(0, 0),
+            orientation=orientation,
+            fov=fov,
+            detection_range=detection_range
+        )
 
     @property
     def position(self) -> Coordinate:
@@ -87,9 +125,7 @@ class Camera:
             raise TypeError("value must be a Coordinate instance.")
 
         self._position = value
-
-        if self.__ready_to_detect:
-            self._set_detection_area()
+        self._detection_area = None
 
     @property
     def orientation(self) -> float:
@@ -108,15 +144,18 @@ class Camera:
             value (int | float): new orientation of the camera.
 
         Raises:
-            TypeError: if the value is not an int or float.
+            TypeError: if the value is not an int or float (Python or
+                NumPy scalar).
         """
-        if not isinstance(value, (int, float)):
+        if not isinstance(value, _NUMBERS):
             raise TypeError("value must be an int or float.")
 
-        self._orientation = float(value)
+        # Unchanged values keep the cached detection area and detections:
+        if float(value) == self._orientation:
+            return
 
-        if self.__ready_to_detect:
-            self._set_detection_area()
+        self._orientation = float(value)
+        self._outdated = True
 
     @property
     def fov(self) -> float:
@@ -135,15 +174,19 @@ class Camera:
             value (int | float): new field of view of the camera.
 
         Raises:
-            TypeError: if the value is not an int or float.
+            TypeError: if the value is not an int or float (Python or
+                NumPy scalar).
         """
-        if not isinstance(value, (int, float)):
+        if not isinstance(value, _NUMBERS):
             raise TypeError("value must be an int or float.")
 
-        self._fov = float(value)
+        if float(value) == self._fov:
+            return
 
-        if self.__ready_to_detect:
-            self._set_detection_area()
+        self._fov = float(value)
+        self._cos_half_fov = cos(self._fov / 2)
+        self._sin_half_fov = sin(self._fov / 2)
+        self._outdated = True
 
     @property
     def detection_range(self) -> float:
@@ -162,16 +205,102 @@ class Camera:
             value (int | float): new detection range of the camera.
 
         Raises:
-            TypeError: if the value is not an int or float.
+            TypeError: if the value is not an int or float (Python or
+                NumPy scalar).
         """
-        if not isinstance(value, (int, float)):
+        if not isinstance(value, _NUMBERS):
             raise TypeError("value must be an int or float.")
 
+        if float(value) == self._detection_range:
+            return
+
         self._detection_range = float(value)
+        self._outdated = True
+
+    @property
+    def detection_area(self) -> Tuple[Triangle, ...]:
+        """Get the detection area of the camera.
+
+        Since containment tests do not use them, the triangles are only built
+        on the first access after the camera changes.
+
+        Returns:
+            Tuple[Triangle, ...]: non-degenerate triangles that make up the
+                detection area.
+        """
+        if self._outdated:
+            self._set_detection_area()
 
-        if self.__ready_to_detect:
+        if self._detection_area is None:
+            triangles = (
+                self._boundaries[self._TRIANGLES]
+                + (self._position.x, self._position.y)
+            )
+
+            self._detection_area = tuple(
+                Triangle(*(Coordinate(*vertex) for vertex in vertices))
+                for vertices in triangles[self._valid]
+            )
+
+        return self._detection_area
+
+    @property
+    def outline(self) -> np.ndarray:
+        """Get the outline of the detection area.
+
+        Returns:
+            np.ndarray: `(4, 2)` array with the position of the camera, the
+                end of its `orientation - fov / 2` boundary, the point at
+                detection range along its orientation and the end of its
+                `orientation + fov / 2` boundary, in that order. For fields
+                of view of pi or wider, the position of the camera lies
+                within the area and is left out, so the array is `(3, 2)`.
+        """
+        if self._outdated:
             self._set_detection_area()
 
+        indices = self._OUTLINE if self._fov < pi else self._WIDE_OUTLINE
+
+        return (
+            self._boundaries[indices]
+            + (self._position.x, self._position.y)
+        )
+
+    def configure(self, *, position: Optional[Coordinate] = None,
+                  orientation: Optional[Union[int, float]] = None,
+                  fov: Optional[Union[int, float]] = None,
+                  detection_range: Optional[Union[int, float]] = None
+                  ) -> None:
+        """Set several properties of the camera at once.
+
+        Values are validated as with their respective properties, and the
+        detection area is only updated once, on the next use.
+
+        Args:
+            position (Coordinate, optional): new position of the camera.
+                Defaults to None. If None, the position is not changed.
+            orientation (int | float, optional): new orientation of the
+                camera. Defaults to None. If None, it is not changed.
+            fov (int | float, optional): new field of view of the camera.
+                Defaults to None. If None, it is not changed.
+            detection_range (int | float, optional): new detection range of
+                the camera. Defaults to None. If None, it is not changed.
+
+        Raises:
+            TypeError: if any of the values is not of a valid type.
+        """
+        if position is not None:
+            self.position = position
+
+        if orientation is not None:
+            self.orientation = orientation
+
+        if fov is not None:
+            self.fov = fov
+
+        if detection_range is not None:
+            self.detection_range = detection_range
+
     @property
     def detected(self) -> List[ConeArray]:
         """Get the detected cone arrays.
@@ -185,7 +314,9 @@ class Camera:
         """Detect cones inside provided cone arrays.
 
         This method is used to determine which cones of all provided arrays are
-        located inside the detection range.
+        located inside the detection range. If neither the camera nor the
+        arrays have changed since the last call, the previous detection is
+        kept.
 
         Args:
             *cone_arrays (ConeArray, optional): the cone array(s) to detect
@@ -194,67 +325,350 @@ class Camera:
         Raises:
             TypeError: if any of the cone arrays is not a ConeArray type.
         """
-        if not cone_arrays:
-            self._detected = []
-        else:
-            if not any(isinstance(array, ConeArray) for array in cone_arrays):
+        # Arrays are validated while their position buffers are gathered:
+        sources = []
+        for array in cone_arrays:
+            if not isinstance(array, ConeArray):
                 raise TypeError("all cone arrays must be ConeArray types")
 
-            self._detected = [
-                ConeArray(
-                    *[
-                        cone for cone in array
-                        if cone in self
-                    ]
-                ) for array in cone_arrays
-            ]
+            sources.append((array, array.positions))
 
-    def _set_detection_area(self) -> None:
-        """Determine the detection area of the camera.
+        if self._outdated:
+            self._set_detection_area()
+
+        pose = (self._position.x, self._position.y)
+
+        if self._is_detected(pose, sources):
+            return
+
+        # Arrays are already validated, so the mask is computed directly:
+        self._detected = [
+            array.select(self._array_mask(array)) for array, _ in sources
+        ]
+        self._detection_key = (self._coefficients, pose, sources)
+
+    def _is_detected(self, pose: Tuple[float, float],
+                     sources: List[Tuple[ConeArray, np.ndarray]]) -> bool:
+        """Check whether the last detection is still valid.
+
+        Since the coefficients of the detection area and the position buffers
+        of cone arrays are replaced (never modified) whenever the camera or
+        the arrays change, their identities act as version counters.
+
+        Args:
+            pose (Tuple[float, float]): current position of the camera.
+            sources (List[Tuple[ConeArray, np.ndarray]]): cone arrays to
+                detect cones from, along with their position buffers.
+
+        Returns:
+            bool: whether the detected cones would not change.
+        """
+        if self._detection_key is None:
+            return False
+
+        coefficients, last_pose, last_sources = self._detection_key
+
+        return (
+            coefficients is self._coefficients
+            and last_pose == pose
+            and len(last_sources) == len(sources)
+            and all(
+                last_array is array and last_positions is positions
+                for (last_array, last_positions), (array, positions)
+                in zip(last_sources, sources)
+            )
+        )
+
+    def mask(self, array: ConeArray) -> np.ndarray:
+        """Determine which cones of an array are within the detection area.
+
+        Offsets from the camera are computed in double precision, but checked
+        against the area in single precision. The result can thus differ from
+        `cone in camera` only for cones within about a micrometer of the
+        boundary of the area, regardless of the coordinates of the track.
+
+        Args:
+            array (ConeArray): the cone array to be checked.
 
-        This method determines the detection area of the camera, which is
-        represented by a combination of triangles.
+        Returns:
+            np.ndarray: boolean mask with a True value for each cone of the
+                array that is within the detection area.
+
+        Raises:
+            TypeError: if the array is not a ConeArray instance.
+        """
+        if not isinstance(array, ConeArray):
+            raise TypeError("array must be a ConeArray instance.")
+
+        return self._array_mask(array)
+
+    @staticmethod
+    def masks(cameras: Iterable[Camera], array: ConeArray) -> np.ndarray:
+        """Determine which cones of an array are within each camera's area.
+
+        This method is equivalent to stacking the masks of each camera, but
+        the array is validated and its positions are read only once.
+
+        Args:
+            cameras (Iterable[Camera]): the cameras to check the array with.
+            array (ConeArray): the cone array to be checked.
+
+        Returns:
+            np.ndarray: `(K, N)` boolean array with a row for each camera
+                and a True value for each cone of the array that is within
+                its detection area.
+
+        Raises:
+            TypeError: if any of the cameras is not a Camera instance or the
+                array is not a ConeArray instance.
+        """
+        cameras = list(cameras)
+
+        if not all(isinstance(camera, Camera) for camera in cameras):
+            raise TypeError("all cameras must be Camera instances.")
+
+        if not isinstance(array, ConeArray):
+            raise TypeError("array must be a ConeArray instance.")
+
+        masks = np.empty((len(cameras), len(array)), dtype=bool)
+
+        for mask, camera in zip(masks, cameras):
+            mask[:] = camera._array_mask(array)
+
+        return masks
+
+    def _array_mask(self, array: ConeArray) -> np.ndarray:
+        """Determine which cones of an array are within the detection area.
+
+        For arrays with more than `_INDEXED` cones, only those within the
+        bounding box of the detection range of the camera are checked, using
+        the spatial index of the array.
+
+        Args:
+            array (ConeArray): the cone array to be checked.
+
+        Returns:
+            np.ndarray: boolean mask with a True value for each cone of the
+                array that is within the detection area.
+        """
+        if len(array) <= self._INDEXED:
+            return self._contains(array.positions)
+
+        if self._outdated:
+            self._set_detection_area()
+
+        # The grid cell only depends on the detection range, so that the
+        # index of the array is reused while the camera moves:
+        x, y = self._position.x, self._position.y
+        reach = self._reach ** 0.5
+        candidates = array.indices_in_box(
+            x - reach, x + reach, y - reach, y + reach, cell=2 * reach
+        )
+
+        mask = np.zeros(len(array), dtype=bool)
+        mask[candidates] = self._contains(array.positions[candidates])
+
+        return mask
+
+    def _contains(self, positions: np.ndarray) -> np.ndarray:
+        """Determine which positions are within the detection area.
+
+        The detection area is made up of convex polygons (a single one for
+        fields of view under pi, its two triangles otherwise) whose edges run
+        counterclockwise. A position is inside a polygon if none of the cross
+        products of its edges and the vectors from their origins to the
+        position are negative. Degenerate polygons contain no positions.
+
+        Each cross product is a linear function of the position, so all of
+        them are evaluated with a single matrix product against the
+        precomputed edge coefficients. Positions are taken relative to the
+        camera in order to keep the evaluation exact at its position. Signs
+        are combined with element-wise boolean operations on contiguous rows,
+        which are much faster than reductions along short axes.
+
+        Large arrays are processed in blocks of `_BLOCK_SIZE` positions, so
+        that the intermediate arrays of each block stay in cache. Since the
+        area lies within the detection range of the camera, positions out of
+        range are rejected first, and if few positions of a block remain
+        (which is the usual case on a whole track), the area is only checked
+        against those.
+
+        Args:
+            positions (np.ndarray): `(N, 2)` array of positions.
+
+        Returns:
+            np.ndarray: boolean mask with a True value for each position that
+                is within the detection area.
         """
-        left_rot = self._orientation - self._fov / 2
-        right_rot = self._orientation + self._fov / 2
+        if self._outdated:
+            self._set_detection_area()
 
-        radius = self._position + Coordinate(
-            cos(self._orientation) * self._detection_range,
-            sin(self._orientation) * self._detection_range
+        x, y = self._position.x, self._position.y
+        relative = np.empty(
+            (2, min(len(positions), self._BLOCK_SIZE)), dtype=np.float32
         )
-        left_boundary = self._position + Coordinate(
-            cos(left_rot) * self._detection_range,
-            sin(left_rot) * self._detection_range
+        inside = np.zeros(len(positions), dtype=bool)
+
+        for start in range(0, len(positions), self._BLOCK_SIZE):
+            block = positions[start:start + self._BLOCK_SIZE]
+            block_relative = relative[:, :len(block)]
+            xs, ys = block_relative
+
+            # Each coordinate is shifted on its own, since broadcasting over
+            # rows of two values is much slower. Offsets are computed in the
+            # precision of the positions and only then rounded to single
+            # precision, so that distant tracks keep their resolution:
+            np.subtract(block[:, 0], x, out=xs)
+            np.subtract(block[:, 1], y, out=ys)
+
+            near = xs * xs + ys * ys <= self._reach
+
+            if np.count_nonzero(near) <= self._SPARSE * len(block):
+                near = np.flatnonzero(near)
+                inside[start + near] = self._area_mask(block_relative[:, near])
+            else:
+                inside[start:start + len(block)] = self._area_mask(
+                    block_relative
+                )
+
+        return inside
+
+    def _area_mask(self, relative: np.ndarray) -> np.ndarray:
+        """Determine which relative positions are within the detection area.
+
+        Args:
+            relative (np.ndarray): `(2, N)` single precision array with the
+                coordinates of positions relative to the camera.
+
+        Returns:
+            np.ndarray: boolean mask with a True value for each position that
+                is within the detection area.
+        """
+        cross = self._coefficients[:, :2] @ relative
+        cross += self._coefficients[:, 2:]
+
+        negative = cross < 0
+        inside = np.zeros(relative.shape[1], dtype=bool)
+
+        for rows in self._polygons:
+            inside |= ~np.logical_or.reduce(negative[rows])
+
+        return inside
+
+    def _set_detection_area(self) -> None:
+        """Determine the detection area of the camera.
+
+        This method determines the vertices of the detection area relative to
+        the position of the camera, which only depend on its orientation,
+        field of view and detection range, as well as the coefficients used
+        for containment tests. Since none of them depend on the position, it
+        is only called on the first containment test after any of those
+        parameters change, so that moving the camera is free and changing
+        several parameters at once only updates the area once.
+        """
+        # The boundaries are rotated by half the field of view from the
+        # orientation, using the angle sum identities and the trigonometric
+        # ratios of the half field of view cached by its setter:
+        cos_o = cos(self._orientation)
+        sin_o = sin(self._orientation)
+        cos_h = self._cos_half_fov
+        sin_h = self._sin_half_fov
+
+        self._boundaries[1:] = (
+            (cos_o * cos_h + sin_o * sin_h, sin_o * cos_h - cos_o * sin_h),
+            (cos_o * cos_h - sin_o * sin_h, sin_o * cos_h + cos_o * sin_h),
+            (cos_o, sin_o)
         )
-        right_boundary = self._position + Coordinate(
-            cos(right_rot) * self._detection_range,
-            sin(right_rot) * self._detection_range
+        self._boundaries[1:] *= self._detection_range
+
+        triangles = self._boundaries[self._TRIANGLES]
+        edges = np.roll(triangles, -1, axis=1) - triangles
+        self._valid = (
+            edges[:, 0, 0] * edges[:, 1, 1] - edges[:, 0, 1] * edges[:, 1, 0]
+        ) != 0
+
+        # For fields of view under pi, the outline of the area is a convex
+        # quadrilateral and is tested as a single polygon, with four edges
+        # instead of six. Otherwise, its non-degenerate triangles are tested:
+        if 0 < self._fov < pi and self._detection_range > 0:
+            vertices = self._boundaries[self._OUTLINE][np.newaxis]
+        else:
+            vertices = triangles[self._valid]
+
+        edges = np.roll(vertices, -1, axis=1) - vertices
+        count, sides = vertices.shape[:2]
+
+        # Edges are reversed for clockwise polygons, so that positions are
+        # inside a polygon if no cross product with its edges is negative:
+        edges *= np.sign(
+            edges[:, 0, 0] * edges[:, 1, 1] - edges[:, 0, 1] * edges[:, 1, 0]
+        )[:, np.newaxis, np.newaxis]
+
+        # Cross product of each edge with a position (x, y) relative to the
+        # camera, expressed as the coefficients of `a * x + b * y + c`:
+        coefficients = np.column_stack((
+            -edges[..., 1].ravel(),
+            edges[..., 0].ravel(),
+            (
+                edges[..., 1] * vertices[..., 0]
+                - edges[..., 0] * vertices[..., 1]
+            ).ravel()
+        ))
+        self._polygons = tuple(
+            slice(start, start + sides)
+            for start in range(0, count * sides, sides)
         )
 
-        self._detection_area = (
-            Triangle(
-                self._position,
-                left_boundary,
-                right_boundary
-            ), Triangle(
-                left_boundary,
-                right_boundary,
-                radius
-            )
+        # Plain float copy of the coefficients, for single element
+        # containment tests:
+        self._half_planes = tuple(
+            tuple(map(tuple, polygon))
+            for polygon in coefficients.reshape(count, sides, 3).tolist()
         )
 
-    def plot(self, ax: matplotlib.axes.Axes = None, **kwargs) -> None:
+        # Squared detection range, with a small margin so that rounding never
+        # rejects positions on the boundary of the area:
+        self._reach = (self._detection_range * (1 + 1e-3)) ** 2
+
+        # Single precision copy for batch containment tests, which evaluate
+        # positions relative to the camera:
+        self._coefficients = coefficients.astype(np.float32)
+
+        self._detection_area = None
+        self._outdated = False
+
+    def plot(self, ax: matplotlib.axes.Axes = None, rasterized: bool = True,
+             **kwargs) -> None:
         """Plot the camera and detection range.
 
         Args:
             ax (matplotlib.axes.Axes, optional): ax to plot on. Defaults to
                 None. If None, plt.gca() is used.
-            **kwargs: keyword arguments for matplotlib.pyplot.plot.
+            rasterized (bool, optional): whether to rasterize the detection
+                area when the figure is saved to a vector format (the
+                resolution is set by the `dpi` argument of `savefig`).
+                Defaults to True.
+            **kwargs: keyword arguments for matplotlib.pyplot.plot. The
+                `color`, `alpha` and `zorder` ones are also passed to
+                matplotlib.pyplot.fill for the detection area, whose
+                transparency defaults to 0.2.
         """
         ax = ax if ax is not None else plt.gca()
 
-        for triangle in self._detection_area:
-            triangle.plot(ax=ax, annotate=False, **kwargs)
+        if self._outdated:
+            self._set_detection_area()
+
+        # The whole area is drawn as a single filled polygon, skipping it if
+        # it is degenerate:
+        if self._valid.any():
+            xs, ys = self.outline.T
+
+            ax.fill(xs, ys, **{
+                "alpha": 0.2,
+                **{key: kwargs[key] for key in self._FILL_KWARGS
+                   if key in kwargs},
+                "rasterized": rasterized
+            })
 
         self._position.plot(ax=ax, annotate=False, **kwargs)
 
@@ -274,10 +688,24 @@ class Camera:
         if not isinstance(element, Cone):
             raise TypeError("element must be a Cone instance.")
 
-        return any(
-            element.position in triangle
-            for triangle in self._detection_area
-        )
+        if self._outdated:
+            self._set_detection_area()
+
+        x = element.x - self._position.x
+        y = element.y - self._position.y
+
+        if x * x + y * y > self._reach:
+            return False
+
+        # Each polygon is rejected as soon as a cross product is negative:
+        for half_planes in self._half_planes:
+            for a, b, c in half_planes:
+                if a * x + b * y + c < 0:
+                    break
+            else:
+                return True
+
+        return False
 
     def __repr__(self) -> str:
         """Get the raw representation of the Camera instance.
@@ -0,0 +1,56 @@
+"""Container module for vehicle dynamics utilities.
+
+This module contains all definitions of data types and functions used to
+simulate the motion of vehicles. They operate on NumPy arrays, so that the
+states of many vehicles can be updated at once.
+
+Authors:
+    Paulo Sanchez (@erlete)
+"""
+
+from typing import Union
+
+import numpy as np
+
+# `step` is too generic a name for the package namespace, so it is only
+# available from this module:
+__all__ = ["STATE_DTYPE"]
+
+STATE_DTYPE: np.dtype = np.dtype([
+    ("x", np.float64),
+    ("y", np.float64),
+    ("orientation", np.float64),
+    ("steering", np.float64),
+    ("speed", np.float64),
+    ("acceleration", np.float64),
+    ("torque", np.float64)
+])
+
+
+def step(x: np.ndarray, y: np.ndarray, orientation: np.ndarray,
+         steering: np.ndarray, speed: np.ndarray, acceleration: np.ndarray,
+         wheelbase: Union[float, np.ndarray], dt: float) -> None:
+    """Advance vehicle states by a time step, in place.
+
+    The states are integrated with the kinematic bicycle model and the
+    explicit Euler method. All arrays must be broadcastable to each other,
+    and fields of a `STATE_DTYPE` array can be passed directly, since they
+    are views of the array.
+
+    Args:
+        x (np.ndarray): x coordinates of the vehicles [m].
+        y (np.ndarray): y coordinates of the vehicles [m].
+        orientation (np.ndarray): orientations of the vehicles [rad].
+        steering (np.ndarray): steering of the front wheels [rad].
+        speed (np.ndarray): speeds of the vehicles [m/s].
+        acceleration (np.ndarray): accelerations of the vehicles [m/s^2].
+        wheelbase (float | np.ndarray): distance between the front and rear
+            axis of the vehicles [m].
+        dt (float): time step [s].
+    """
+    distance = speed * dt
+
+    x += distance * np.cos(orientation)
+    y += distance * np.sin(orientation)
+    orientation += distance * np.tan(steering) / wheelbase
+    speed += acceleration * dt
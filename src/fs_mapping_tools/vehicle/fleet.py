@@ -0,0 +1,763 @@
+"""Container module for car fleet representation classes.
+
+This module contains all definitions of classes and utilities used to
+represent many cars at once. States are stored as parallel NumPy arrays
+(columns), so that they can be updated with vectorized operations instead of
+per-car Python loops.
+
+Authors:
+    Paulo Sanchez (@erlete)
+"""
+from __future__ import annotations
+
+from math import cos, sin
+from numbers import Integral
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+from bidimensional import Coordinate
+from numpy.typing import ArrayLike, DTypeLike
+
+from ..vehicle.car import Car, Engine, State, Structure
+from ..vehicle.dynamics import STATE_DTYPE, step
+
+__all__ = ["CarFleet", "CarHandle", "CarStateView", "PositionView"]
+
+# Alignment of the columns of fleets, in bytes (one cache line):
+_ALIGNMENT = 64
+
+
+def _aligned_zeros(n: int, dtype: np.dtype) -> np.ndarray:
+    """Allocate a zero-filled array aligned to a cache line.
+
+    Args:
+        n (int): number of elements of the array.
+        dtype (np.dtype): data type of the array.
+
+    Returns:
+        np.ndarray: zero-filled `(n,)` array whose data starts at a
+            multiple of `_ALIGNMENT` bytes.
+    """
+    size = n * dtype.itemsize
+    buffer = np.zeros(size + _ALIGNMENT, dtype=np.uint8)
+    offset = -buffer.ctypes.data % _ALIGNMENT
+
+    return buffer[offset:offset + size].view(dtype)
+
+
+class CarFleet:
+    """Car fleet representation class.
+
+    This class represents the states of a number of cars as a structure of
+    arrays: each state field is stored in a separate column, with one element
+    per car. Structures are kept as references to the original objects, since
+    they are static, but their scalar direction properties are also stored
+    as columns so that they can be read for all cars at once.
+
+    Attributes:
+        position_x (np.ndarray): x coordinates of the cars [m].
+        position_y (np.ndarray): y coordinates of the cars [m].
+        orientation (np.ndarray): orientations of the cars [rad].
+        steering (np.ndarray): steering of the front wheels of the cars [rad].
+        speed (np.ndarray): speeds of the cars [m/s].
+        acceleration (np.ndarray): accelerations of the cars [m/s^2].
+        torque (np.ndarray): torques of the engines of the cars [Nm].
+        wheelbase (np.ndarray): distances between the front and rear axis of
+            the cars [m].
+        front_track (np.ndarray): distances between the front wheels of the
+            cars [m].
+        rear_track (np.ndarray): distances between the rear wheels of the
+            cars [m].
+        front_max_steering (np.ndarray): steering angles of the front axis of
+            the cars [rad].
+        rear_max_steering (np.ndarray): steering angles of the rear axis of
+            the cars [rad].
+        front_left_diameter (np.ndarray): diameters of the front left wheels
+            of the cars [m].
+        front_right_diameter (np.ndarray): diameters of the front right
+            wheels of the cars [m].
+        rear_left_diameter (np.ndarray): diameters of the rear left wheels of
+            the cars [m].
+        rear_right_diameter (np.ndarray): diameters of the rear right wheels
+            of the cars [m].
+        structures (List[Optional[Structure]]): structures of the cars.
+    """
+
+    __slots__ = (
+        "position_x",
+        "position_y",
+        "orientation",
+        "steering",
+        "speed",
+        "acceleration",
+        "torque",
+        "wheelbase",
+        "front_track",
+        "rear_track",
+        "front_max_steering",
+        "rear_max_steering",
+        "front_left_diameter",
+        "front_right_diameter",
+        "rear_left_diameter",
+        "rear_right_diameter",
+        "structures",
+    )
+
+    # State columns of the fleet, in `State` order (position excluded):
+    COLUMNS = ("orientation", "steering", "speed", "acceleration", "torque")
+
+    # Number of cars updated at once by `step`:
+    BLOCK_SIZE = 16384
+
+    # Structure columns of the fleet, with the `Structure` attribute each of
+    # them is read from:
+    STRUCTURE_COLUMNS = {
+        "wheelbase": "direction.wheelbase",
+        "front_track": "direction.front_axis.track",
+        "rear_track": "direction.rear_axis.track",
+        "front_max_steering": "direction.front_axis.max_steering",
+        "rear_max_steering": "direction.rear_axis.max_steering",
+        "front_left_diameter": "direction.front_axis.left_wheel.diameter",
+        "front_right_diameter": "direction.front_axis.right_wheel.diameter",
+        "rear_left_diameter": "direction.rear_axis.left_wheel.diameter",
+        "rear_right_diameter": "direction.rear_axis.right_wheel.diameter",
+    }
+
+    def __init__(self, n: int, dtype: DTypeLike = np.float64) -> None:
+        """Initialize a CarFleet instance.
+
+        All state and structure columns are initialized to zero and all
+        structures to None. Wheelbases must be set before updating the
+        states. Columns are aligned to cache lines, so that vectorized
+        operations never split loads across them.
+
+        Single precision columns halve the memory traffic of fleet updates,
+        but positions far from the origin lose resolution quickly (about
+        0.1 mm at 1 km), which makes small integration steps inaccurate.
+        Double precision is therefore used by default.
+
+        Args:
+            n (int): number of cars of the fleet.
+            dtype (DTypeLike, optional): floating point data type of the
+                columns. Defaults to np.float64.
+
+        Raises:
+            TypeError: if n is not an int or dtype is not a floating point
+                data type.
+            ValueError: if n is negative.
+        """
+        if not isinstance(n, Integral):
+            raise TypeError("n must be an int.")
+
+        n = int(n)
+
+        if n < 0:
+            raise ValueError("n must be a non-negative number.")
+
+        dtype = np.dtype(dtype)
+
+        if not np.issubdtype(dtype, np.floating):
+            raise TypeError("dtype must be a floating point data type.")
+
+        self.position_x = _aligned_zeros(n, dtype)
+        self.position_y = _aligned_zeros(n, dtype)
+
+        for column in (*self.COLUMNS, *self.STRUCTURE_COLUMNS):
+            setattr(self, column, _aligned_zeros(n, dtype))
+
+        self.structures: List[Optional[Structure]] = [None] * n
+
+    @classmethod
+    def from_cars(cls, cars: Iterable[Car],
+                  dtype: DTypeLike = np.float64) -> CarFleet:
+        """Get a CarFleet instance from a collection of cars.
+
+        Args:
+            cars (Iterable[Car]): cars of the fleet.
+            dtype (DTypeLike, optional): floating point data type of the
+                columns. Defaults to np.float64.
+
+        Returns:
+            CarFleet: fleet with the states and structures of the cars.
+
+        Raises:
+            TypeError: if any of the elements is not a Car instance.
+        """
+        cars = list(cars)
+
+        if not all(isinstance(car, Car) for car in cars):
+            raise TypeError("all elements must be Car instances.")
+
+        fleet = cls(len(cars), dtype)
+
+        fleet.position_x[:] = [car.state.position.x for car in cars]
+        fleet.position_y[:] = [car.state.position.y for car in cars]
+
+        for column in cls.COLUMNS:
+            getattr(fleet, column)[:] = [
+                getattr(car.state, column) for car in cars
+            ]
+
+        for column, attribute in cls.STRUCTURE_COLUMNS.items():
+            getter = attrgetter(attribute)
+            getattr(fleet, column)[:] = [
+                getter(car.structure) for car in cars
+            ]
+
+        fleet.structures = [car.structure for car in cars]
+
+        return fleet
+
+    @classmethod
+    def from_arrays(cls, position_x: ArrayLike, position_y: ArrayLike,
+                    dtype: DTypeLike = np.float64,
+                    **columns: ArrayLike) -> CarFleet:
+        """Get a CarFleet instance from arrays of values.
+
+        This method fills the columns of the fleet directly, without creating
+        any Car or State instance. Values are broadcast to the number of cars,
+        so scalars can be used for columns that are equal for all of them.
+
+        Args:
+            position_x (ArrayLike): x coordinates of the cars [m].
+            position_y (ArrayLike): y coordinates of the cars [m].
+            dtype (DTypeLike, optional): floating point data type of the
+                columns. Defaults to np.float64.
+            **columns (ArrayLike): values of any other state or structure
+                column, by name. Unspecified columns are set to zero.
+
+        Returns:
+            CarFleet: fleet with the given values.
+
+        Raises:
+            TypeError: if any of the columns does not exist.
+            ValueError: if the values cannot be broadcast to the number of
+                cars.
+        """
+        for name in columns:
+            if name not in cls.COLUMNS and name not in cls.STRUCTURE_COLUMNS:
+                raise TypeError(f"unknown column \"{name}\"")
+
+        fleet = cls(len(position_x), dtype)
+
+        fleet.position_x[:] = position_x
+        fleet.position_y[:] = position_y
+
+        for name, values in columns.items():
+            getattr(fleet, name)[:] = values
+
+        return fleet
+
+    def to_cars(self) -> List[Car]:
+        """Get the cars of the fleet as Car instances.
+
+        Returns:
+            List[Car]: cars with a copy of the states of the fleet and
+                its structures.
+        """
+        columns = [getattr(self, column).tolist() for column in self.COLUMNS]
+
+        return [
+            Car(State(Coordinate(x, y), *values), structure)
+            for x, y, *values, structure in zip(
+                self.position_x.tolist(), self.position_y.tolist(),
+                *columns, self.structures
+            )
+        ]
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Get the state columns of the fleet.
+
+        The columns are returned without copying them, named and ordered as
+        the fields of `STATE_DTYPE`. Since they are plain NumPy arrays, they
+        can be handed to other array libraries without copies through the
+        DLPack protocol (e.g. `torch.from_dlpack(column)`).
+
+        Returns:
+            Dict[str, np.ndarray]: state columns of the fleet by field name.
+        """
+        return dict(zip(STATE_DTYPE.names, (
+            self.position_x, self.position_y,
+            *(getattr(self, column) for column in self.COLUMNS)
+        )))
+
+    def to_records(self) -> np.ndarray:
+        """Get the states of the fleet as a record array.
+
+        The record array is packed in a single contiguous buffer, so that it
+        can be serialized or passed to other libraries at once.
+
+        Returns:
+            np.ndarray: `(N,)` array of `STATE_DTYPE` type with the states of
+                the cars.
+        """
+        return np.rec.fromarrays(
+            tuple(self.columns().values()), dtype=STATE_DTYPE
+        )
+
+    def load_records(self, records: np.ndarray) -> None:
+        """Set the states of the fleet from a record array.
+
+        Args:
+            records (np.ndarray): `(N,)` array of `STATE_DTYPE` type with the
+                states of the cars.
+
+        Raises:
+            TypeError: if the records are not of `STATE_DTYPE` type.
+            ValueError: if the number of records does not match the number
+                of cars of the fleet.
+        """
+        if not isinstance(records, np.ndarray) or records.dtype != STATE_DTYPE:
+            raise TypeError("records must be an array of STATE_DTYPE type.")
+
+        if records.shape != (len(self),):
+            raise ValueError("there must be one record per car.")
+
+        for name, column in self.columns().items():
+            column[:] = records[name]
+
+    def clamp_to_engine(self, engine: Engine) -> None:
+        """Clamp the speeds, accelerations and torques to an engine's ranges.
+
+        The columns are clamped in place.
+
+        Args:
+            engine (Engine): engine whose valid ranges are applied to all the
+                cars of the fleet.
+
+        Raises:
+            TypeError: if the engine is not an Engine instance.
+        """
+        if not isinstance(engine, Engine):
+            raise TypeError("engine must be an Engine instance.")
+
+        for column in ("speed", "acceleration", "torque"):
+            values = getattr(self, column)
+            low, high = getattr(engine, column)
+
+            np.clip(values, low, high, out=values)
+
+    def step(self, dt: Union[int, float]) -> None:
+        """Advance the states of all cars by a time step.
+
+        The columns are updated in place with the kinematic bicycle model
+        (see `step` in the dynamics module), so views of them remain valid.
+
+        Large fleets are updated in blocks of `BLOCK_SIZE` cars, so that the
+        fields and temporaries of each block stay in cache across all the
+        operations of the model instead of streaming whole columns through
+        memory once per operation.
+
+        Args:
+            dt (int | float): time step [s].
+
+        Raises:
+            ValueError: if the wheelbase of any car is not positive.
+        """
+        if not (self.wheelbase > 0).all():
+            raise ValueError("all wheelbases must be positive.")
+
+        for start in range(0, len(self), self.BLOCK_SIZE):
+            block = slice(start, start + self.BLOCK_SIZE)
+
+            step(
+                self.position_x[block], self.position_y[block],
+                self.orientation[block], self.steering[block],
+                self.speed[block], self.acceleration[block],
+                self.wheelbase[block], dt
+            )
+
+    def wheel_diameters(self) -> np.ndarray:
+        """Get the diameters of the wheels of all cars.
+
+        Returns:
+            np.ndarray: `(N, 4)` array with the diameters of the front left,
+                front right, rear left and rear right wheels of each car.
+        """
+        return np.stack((
+            self.front_left_diameter, self.front_right_diameter,
+            self.rear_left_diameter, self.rear_right_diameter
+        ), axis=1)
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Get the data type of the columns of the fleet.
+
+        Returns:
+            np.dtype: data type of the columns of the fleet.
+        """
+        return self.position_x.dtype
+
+    def state(self, index: int) -> CarStateView:
+        """Get a view of the state of a car of the fleet.
+
+        Args:
+            index (int): index of the car.
+
+        Returns:
+            CarStateView: view of the state of the car.
+
+        Raises:
+            TypeError: if the index is not an int.
+            IndexError: if the index is out of range.
+        """
+        return CarStateView(self, index)
+
+    def __getitem__(self, index: int) -> CarHandle:
+        """Get a handle to a car of the fleet.
+
+        Args:
+            index (int): index of the car.
+
+        Returns:
+            CarHandle: handle to the car.
+
+        Raises:
+            TypeError: if the index is not an int.
+            IndexError: if the index is out of range.
+        """
+        return CarHandle(self, index)
+
+    def __len__(self) -> int:
+        """Get the number of cars of the fleet.
+
+        Returns:
+            int: number of cars of the fleet.
+        """
+        return len(self.position_x)
+
+    def __repr__(self) -> str:
+        """Get the raw representation of the CarFleet instance.
+
+        Returns:
+            str: raw representation of the CarFleet instance.
+        """
+        return f"CarFleet(n: {len(self)})"
+
+    def __str__(self) -> str:
+        """Get the string representation of the CarFleet instance.
+
+        Returns:
+            str: string representation of the CarFleet instance.
+        """
+        return repr(self)
+
+
+class CarHandle:
+    """Car handle class.
+
+    This class represents a single car of a fleet with the same interface as
+    `Car`, without copying its data: the state is a view of the columns of
+    the fleet and the structure is the one referenced by the fleet.
+
+    Attributes:
+        state (CarStateView): view of the state of the car.
+        structure (Optional[Structure]): structure of the car.
+    """
+
+    __slots__ = ("_fleet", "_state")
+
+    def __init__(self, fleet: CarFleet, index: int) -> None:
+        """Initialize a CarHandle instance.
+
+        Args:
+            fleet (CarFleet): fleet the car belongs to.
+            index (int): index of the car in the fleet.
+
+        Raises:
+            TypeError: if the fleet is not a CarFleet instance or the index
+                is not an int.
+            IndexError: if the index is out of range.
+        """
+        self._state = CarStateView(fleet, index)
+        self._fleet = fleet
+
+    @property
+    def index(self) -> int:
+        """Get the index of the car in the fleet.
+
+        Returns:
+            int: non-negative index of the car in the fleet.
+        """
+        return self._state._index
+
+    @property
+    def state(self) -> CarStateView:
+        """Get the state of the car.
+
+        Returns:
+            CarStateView: view of the state of the car.
+        """
+        return self._state
+
+    @property
+    def structure(self) -> Optional[Structure]:
+        """Get the structure of the car.
+
+        Returns:
+            Optional[Structure]: structure of the car.
+        """
+        return self._fleet.structures[self._state._index]
+
+    # Unit conversions, shared with `Car`:
+    kmh_to_ms = staticmethod(Car.kmh_to_ms)
+    ms_to_kmh = staticmethod(Car.ms_to_kmh)
+
+    def plot(self, ax: matplotlib.axes.Axes = None, **kwargs) -> None:
+        """Plot the car.
+
+        The structure is plotted with a copy of the current state of the car,
+        since plotting relies on `Coordinate` arithmetic.
+
+        Args:
+            ax (matplotlib.axes.Axes, optional): ax to plot on. Defaults to
+                None. If None, plt.gca() is used.
+            **kwargs: keyword arguments for matplotlib.pyplot.plot.
+
+        Raises:
+            ValueError: if the car has no structure.
+        """
+        structure = self.structure
+
+        if structure is None:
+            raise ValueError("the car has no structure to plot.")
+
+        ax = ax if ax is not None else plt.gca()
+
+        state = State(
+            self._state.position.as_coordinate(),
+            *(getattr(self._state, column) for column in CarFleet.COLUMNS)
+        )
+
+        structure.plot(state, ax=ax, **kwargs)
+
+    def __repr__(self) -> str:
+        """Get the raw representation of the CarHandle instance.
+
+        Returns:
+            str: raw representation of the CarHandle instance.
+        """
+        return f"CarHandle(index: {self.index})"
+
+
+class CarStateView:
+    """Car state view class.
+
+    This class provides access to the state of a single car of a fleet with
+    the same interface as `State`. It holds no data: attributes are read
+    from and written to the columns of the fleet.
+
+    Attributes:
+        position (PositionView): position of the car (x [m], y [m]).
+        orientation (float): orientation of the car (front view) [rad].
+        steering (float): steering of the front wheels of the car [rad].
+        speed (float): speed of the car [m/s].
+        acceleration (float): acceleration of the car [m/s^2].
+        torque (float): torque of the engine [Nm].
+    """
+
+    __slots__ = ("_fleet", "_index")
+
+    def __init__(self, fleet: CarFleet, index: int) -> None:
+        """Initialize a CarStateView instance.
+
+        Args:
+            fleet (CarFleet): fleet the car belongs to.
+            index (int): index of the car in the fleet.
+
+        Raises:
+            TypeError: if the fleet is not a CarFleet instance or the index
+                is not an int.
+            IndexError: if the index is out of range.
+        """
+        if not isinstance(fleet, CarFleet):
+            raise TypeError("fleet must be a CarFleet instance.")
+
+        if not isinstance(index, Integral):
+            raise TypeError("index must be an int.")
+
+        index = int(index)
+
+        if not -len(fleet) <= index < len(fleet):
+            raise IndexError("index out of range.")
+
+        object.__setattr__(self, "_fleet", fleet)
+        object.__setattr__(self, "_index", index % len(fleet))
+
+    @property
+    def position(self) -> PositionView:
+        """Get the position of the car.
+
+        Returns:
+            PositionView: view of the position of the car.
+        """
+        return PositionView(self._fleet, self._index)
+
+    @position.setter
+    def position(self, value: Union[Coordinate, PositionView]) -> None:
+        """Set the position of the car.
+
+        Args:
+            value (Coordinate | PositionView): new position of the car.
+
+        Raises:
+            TypeError: if the value is not a Coordinate or PositionView
+                instance.
+        """
+        if not isinstance(value, (Coordinate, PositionView)):
+            raise TypeError(
+                "value must be a Coordinate or PositionView instance."
+            )
+
+        self._fleet.position_x[self._index] = value.x
+        self._fleet.position_y[self._index] = value.y
+
+    @property
+    def direction(self) -> Tuple[float, float]:
+        """Get the unit vector the car is oriented towards.
+
+        Returns:
+            Tuple[float, float]: cosine and sine of the orientation.
+        """
+        orientation = self.orientation
+
+        return cos(orientation), sin(orientation)
+
+    def as_record(self) -> np.ndarray:
+        """Get the state as a NumPy record.
+
+        Returns:
+            np.ndarray: zero-dimensional array of `STATE_DTYPE` type with
+                the values of the state.
+        """
+        return np.array(tuple(
+            column[self._index] for column in self._fleet.columns().values()
+        ), dtype=STATE_DTYPE)
+
+    def __getattr__(self, name: str) -> float:
+        """Get a state field of the car.
+
+        Args:
+            name (str): name of the field.
+
+        Returns:
+            float: value of the field.
+
+        Raises:
+            AttributeError: if the field does not exist.
+        """
+        if name not in CarFleet.COLUMNS:
+            raise AttributeError(
+                f"'CarStateView' object has no attribute '{name}'"
+            )
+
+        return float(getattr(self._fleet, name)[self._index])
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set a state field of the car.
+
+        Args:
+            name (str): name of the field.
+            value (Any): new value of the field.
+
+        Raises:
+            AttributeError: if the field does not exist.
+        """
+        if name == "position":
+            object.__setattr__(self, name, value)
+
+        elif name in CarFleet.COLUMNS:
+            getattr(self._fleet, name)[self._index] = value
+
+        else:
+            raise AttributeError(
+                f"'CarStateView' object has no attribute '{name}'"
+            )
+
+    def __repr__(self) -> str:
+        """Get the raw representation of the CarStateView instance.
+
+        Returns:
+            str: raw representation of the CarStateView instance.
+        """
+        return f"CarStateView(index: {self._index})"
+
+
+class PositionView:
+    """Car position view class.
+
+    This class provides access to the position of a single car of a fleet
+    without allocating a `Coordinate`: its components are read from and
+    written to the position columns of the fleet.
+
+    Attributes:
+        x (float): x coordinate of the car [m].
+        y (float): y coordinate of the car [m].
+    """
+
+    __slots__ = ("_fleet", "_index")
+
+    def __init__(self, fleet: CarFleet, index: int) -> None:
+        """Initialize a PositionView instance.
+
+        Args:
+            fleet (CarFleet): fleet the car belongs to.
+            index (int): non-negative index of the car in the fleet.
+        """
+        self._fleet = fleet
+        self._index = index
+
+    @property
+    def x(self) -> float:
+        """Get the x coordinate of the car.
+
+        Returns:
+            float: x coordinate of the car.
+        """
+        return float(self._fleet.position_x[self._index])
+
+    @x.setter
+    def x(self, value: Union[int, float]) -> None:
+        """Set the x coordinate of the car.
+
+        Args:
+            value (int | float): new x coordinate of the car.
+        """
+        self._fleet.position_x[self._index] = value
+
+    @property
+    def y(self) -> float:
+        """Get the y coordinate of the car.
+
+        Returns:
+            float: y coordinate of the car.
+        """
+        return float(self._fleet.position_y[self._index])
+
+    @y.setter
+    def y(self, value: Union[int, float]) -> None:
+        """Set the y coordinate of the car.
+
+        Args:
+            value (int | float): new y coordinate of the car.
+        """
+        self._fleet.position_y[self._index] = value
+
+    def as_coordinate(self) -> Coordinate:
+        """Get a copy of the position as a Coordinate.
+
+        Returns:
+            Coordinate: coordinate with the current position of the car.
+        """
+        return Coordinate(self.x, self.y)
+
+    def __repr__(self) -> str:
+        """Get the raw representation of the PositionView instance.
+
+        Returns:
+            str: raw representation of the PositionView instance.
+        """
+        return f"PositionView({self.x}, {self.y})"
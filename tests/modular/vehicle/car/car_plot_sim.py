@@ -23,8 +23,15 @@ from fs_mapping_tools import Car
 CAR: Car = Car.fsuk_adsdv_camera()
 ANGULAR_VALUES: np.ndarray = np.arange(0, pi / 2, 0.05)
 
-times = []
-for i in ANGULAR_VALUES:
+# Figure setup:
+fig, (global_ax, local_ax) = plt.subplots(1, 2)
+fig.canvas.mpl_connect(
+    "key_press_event",
+    lambda event: exit(0) if event.key == "escape" else None
+)
+
+times = np.empty(ANGULAR_VALUES.size)
+for index, i in enumerate(ANGULAR_VALUES):
     # Orientation and steering settings:
     CAR.state.orientation = 0
     CAR.state.steering = 0
@@ -34,37 +41,28 @@ for i in ANGULAR_VALUES:
     CAR.state.steering += i
     CAR.structure.camera.orientation += i
 
-    # Plot settings:
-    plt.gcf().canvas.mpl_connect(
-        "key_press_event",
-        lambda event: exit(0) if event.key == "escape" else None
-    )
-
     # Global view:
-    plt.subplot(1, 2, 1)
-    plt.cla()
+    global_ax.cla()
 
     cron = pc()
-    CAR.plot(color="red")
-    result = pc() - cron
-    times.append(result)
+    CAR.plot(ax=global_ax, color="red")
+    times[index] = pc() - cron
 
-    plt.grid(True)
-    plt.axis("equal")
+    global_ax.grid(True)
+    global_ax.axis("equal")
 
     # Local view:
-    plt.subplot(1, 2, 2)
-    plt.cla()
+    local_ax.cla()
 
-    CAR.plot(color="red")
+    CAR.plot(ax=local_ax, color="red")
 
-    plt.grid(True)
-    plt.axis("equal")
-    plt.xlim(
+    local_ax.grid(True)
+    local_ax.axis("equal")
+    local_ax.set_xlim(
         CAR.state.position.x - CAR.structure.direction.wheelbase * 1.5,
         CAR.state.position.x + CAR.structure.direction.wheelbase * 1.5
     )
-    plt.ylim(
+    local_ax.set_ylim(
         CAR.state.position.y - CAR.structure.direction.wheelbase * 1.5,
         CAR.state.position.y + CAR.structure.direction.wheelbase * 1.5
     )
@@ -72,11 +70,15 @@ for i in ANGULAR_VALUES:
     plt.pause(0.01)
 
 # Statistics summary:
+p50, p95, p99 = np.percentile(times, (50, 95, 99))
 print(f"""Plotting statistics:
 
-MAX: {max(times)}s.
-MIN: {min(times)}s.
-AVG: {sum(times) / len(times)}s.
+MAX: {times.max() * 1e3:.2f}ms.
+MIN: {times.min() * 1e3:.2f}ms.
+AVG: {times.mean() * 1e3:.2f}ms.
+P50: {p50 * 1e3:.2f}ms.
+P95: {p95 * 1e3:.2f}ms.
+P99: {p99 * 1e3:.2f}ms.
 """)
 
 # Timing visualization:
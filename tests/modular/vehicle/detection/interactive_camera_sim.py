@@ -23,6 +23,7 @@ from typing import Dict, Tuple
 
 import matplotlib
 import matplotlib.pyplot as plt
+import numpy as np
 from bidimensional import Coordinate
 
 from fs_mapping_tools.track.cones import Cone, ConeArray
@@ -114,35 +115,47 @@ line_2 = ConeArray(*[
     for x_, y_ in zip(data["line_2"]["x"], data["line_2"]["y"])
 ])
 
+camera = Camera()
+
+# Figure setup:
+fig, ax = plt.subplots()
+fig.canvas.mpl_connect("key_press_event", on_press)
+ax.grid(True)
+
+# Limits always span a square, so the axes box keeps an equal aspect ratio:
+ax.set_aspect("equal", adjustable="box")
+
+# The track is static, so it is only plotted once, while the artists of the
+# camera and the detected cones are updated on each frame:
+line_1.plot(ax=ax)
+line_2.plot(ax=ax)
+
+area, = ax.fill([], [], alpha=0.2)
+position, = ax.plot([], [], '.', **Coordinate.STYLES)
+detected, = ax.plot([], [], '.', color="green", ms=10)
+
 # Simulation loop:
 while True:
-    plt.cla()
-    plt.gcf().canvas.mpl_connect("key_press_event", on_press)
-
-    camera = Camera(
-        Coordinate(MODES["x"], MODES["y"]),
-        MODES["orientation"],
-        MODES["angle"],
-        MODES["distance"]
+    camera.configure(
+        position=Coordinate(MODES["x"], MODES["y"]),
+        orientation=MODES["orientation"],
+        fov=MODES["angle"],
+        detection_range=MODES["distance"]
     )
-
-    line_1.plot()
-    line_2.plot()
-    camera.plot()
-
     camera.detect(line_1, line_2)
-    for array in camera.detected:
-        for cone in array.cones:
-            cone.position.plot(color="green")
 
-    plt.xlim(
+    area.set_xy(camera.outline)
+    position.set_data([camera.position.x], [camera.position.y])
+    detected.set_data(*np.concatenate(
+        [array.positions for array in camera.detected]
+    ).T)
+
+    ax.set_xlim(
         camera.position.x - (camera.detection_range + 5),
         camera.position.x + (camera.detection_range + 5)
     )
-    plt.ylim(
+    ax.set_ylim(
         camera.position.y - (camera.detection_range + 5),
         camera.position.y + (camera.detection_range + 5)
     )
-    plt.grid(True)
-    plt.axis("equal")
     plt.pause(PLOT_REFRESH_RATE)
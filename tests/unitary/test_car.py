@@ -0,0 +1,103 @@
+"""Testing suites for the car module.
+
+Author:
+    Paulo Sanchez (@erlete)
+"""
+
+from math import pi
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from fs_mapping_tools import Car, Engine, State
+
+
+class TestCar:
+    """Testing suite for the Car class."""
+
+    def test_speed_conversion(self) -> None:
+        """Test speed unit conversions."""
+        assert Car.kmh_to_ms(36) == pytest.approx(10)
+        assert Car.ms_to_kmh(10) == pytest.approx(36)
+        assert Car.ms_to_kmh(Car.kmh_to_ms(50)) == pytest.approx(50)
+
+        speeds = np.array([0, 18, 72], dtype=np.float64)
+        assert Car.kmh_to_ms(speeds).tolist() == pytest.approx([0, 5, 20])
+        assert Car.ms_to_kmh(speeds).tolist() == pytest.approx(
+            [0, 64.8, 259.2]
+        )
+
+    def test_plot(self) -> None:
+        """Test plot method."""
+        _, ax = plt.subplots()
+        car = Car.fsuk_adsdv_camera()
+
+        car.plot(ax=ax, color="red")
+
+        # Corners and outline of four wheels, three axes and the camera:
+        assert len(ax.lines) == 12 and len(ax.patches) == 1
+        assert all(line.get_color() == "red" for line in ax.lines)
+
+        corners, outline = ax.lines[:2]
+        assert corners.get_linestyle() == "None"
+        assert len(corners.get_xdata()) == 4
+        assert outline.get_xydata()[0].tolist() == (
+            outline.get_xydata()[-1].tolist()
+        )
+
+        # Line-only keyword arguments reach every element:
+        ax.cla()
+        car.plot(ax=ax, ms=4)
+        assert len(ax.lines) == 12 and len(ax.patches) == 1
+
+        plt.close(ax.figure)
+
+
+class TestState:
+    """Testing suite for the State class."""
+
+    def test_direction(self) -> None:
+        """Test orientation unit vector."""
+        state = State(orientation=pi / 2)
+        direction = state.direction
+
+        assert direction == pytest.approx((0, 1))
+        assert state.direction is direction
+
+        state.orientation = pi
+        assert state.direction == pytest.approx((-1, 0))
+        assert State().direction == (1, 0)
+
+
+class TestEngine:
+    """Testing suite for the Engine class."""
+
+    def test_ranges(self) -> None:
+        """Test value range interning."""
+        first = Engine((0, 10), [0, 5], (0, 100))
+        second = Engine((0, 10), (0, 5), (0, 200))
+
+        assert first.speed.tolist() == [0, 10]
+        assert first.acceleration.tolist() == [0, 5]
+        assert first.speed is second.speed
+        assert first.acceleration is second.acceleration
+        assert first.torque is not second.torque
+
+        assert (
+            Car.fsuk_adsdv_camera().structure.engine.speed
+            is Car.fsuk_adsdv_camera().structure.engine.speed
+        )
+
+        with pytest.raises(ValueError):
+            first.speed[0] = 1
+
+        with pytest.raises(ValueError):
+            Engine((0, 10), (0, 5), (0,))
+
+    def test_clip_speed(self) -> None:
+        """Test in place speed clipping."""
+        speed = np.array([-1, 5, 20], dtype=np.float64)
+
+        assert Engine((0, 10), (0, 5), (0, 100)).clip_speed(speed) is speed
+        assert speed.tolist() == [0, 5, 10]
@@ -4,10 +4,12 @@ Author:
     Paulo Sanchez (@erlete)
 """
 
+import matplotlib.pyplot as plt
+import numpy as np
 import pytest
 from bidimensional import Coordinate
 
-from fs_mapping_tools import Cone, ConeArray
+from fs_mapping_tools import Cone, ConeArray, ConeType
 
 
 class TestCone:
@@ -54,6 +56,25 @@ class TestCone:
         assert c3.type == "orange"
         assert c4.type == "orange-big"
 
+        # Test `kind` attribute:
+        assert c1.kind == ConeType.YELLOW
+        assert c2.kind == ConeType.BLUE
+        assert c3.kind == ConeType.ORANGE
+        assert c4.kind == ConeType.ORANGE_BIG
+
+    def test_kind(self) -> None:
+        """Test type enumeration."""
+        c = Cone(self.ZERO, ConeType.ORANGE_BIG)
+
+        assert c.type == "orange-big"
+        assert c == Cone(self.ZERO, "orange-big")
+
+        c.type = ConeType.BLUE
+
+        assert c.type == "blue"
+        assert c.kind == ConeType.BLUE
+        assert ConeArray(c).kind == ConeType.BLUE
+
     def test_properties(self) -> None:
         """Test class properties."""
         c = Cone(self.ZERO, "yellow")
@@ -108,6 +129,25 @@ class TestCone:
             c1 != [1, 2]
             c1 != [c1, c2]
 
+    def test_hash(self) -> None:
+        """Test class hashing."""
+        c1 = Cone(self.ZERO, "yellow")
+        c2 = Cone(Coordinate(0, 0), "yellow")
+
+        assert hash(c1) == hash(c2)
+        assert len({c1, c2}) == 1
+
+        c2.position = Coordinate(1, 0)
+
+        assert c1 != c2
+        assert len({c1, c2}) == 2
+
+        c2.position = self.ZERO
+        c2.type = "blue"
+
+        assert c1 != c2
+        assert len({c1, c2}) == 2
+
     def test_plot(self) -> None:
         """Test plot method."""
         c1 = Cone(self.ZERO, "yellow")
@@ -180,10 +220,13 @@ class TestConeArray:
         ca4 = ConeArray(self.C4)
 
         # Test `cones` attribute:
-        assert ca1.cones == [self.C1]
-        assert ca2.cones == [self.C2]
-        assert ca3.cones == [self.C3]
-        assert ca4.cones == [self.C4]
+        assert ca1.cones == (self.C1,)
+        assert ca2.cones == (self.C2,)
+        assert ca3.cones == (self.C3,)
+        assert ca4.cones == (self.C4,)
+
+        with pytest.raises(AttributeError):
+            ca1.cones.append(self.C1)
 
         # Test `type` attribute:
         assert ca1.type == "yellow"
@@ -191,6 +234,105 @@ class TestConeArray:
         assert ca3.type == "orange"
         assert ca4.type == "orange-big"
 
+    def test_positions(self) -> None:
+        """Test positions buffer."""
+        ca = ConeArray()
+
+        assert ca.positions.shape == (0, 2)
+        assert ca.positions.dtype == np.float64
+
+        ca.cones = [
+            Cone(Coordinate(1, 2), "yellow"),
+            Cone(Coordinate(3, 4), "yellow")
+        ]
+
+        assert ca.positions.tolist() == [[1, 2], [3, 4]]
+
+        positions = ca.positions
+        assert ca.positions is positions
+
+        ca.append(Cone(Coordinate(5, 6), "yellow"))
+        ca[0] = Cone(Coordinate(-1, -2), "yellow")
+        assert positions.tolist() == [[1, 2], [3, 4]]
+
+        assert ca.positions.tolist() == [[-1, -2], [3, 4], [5, 6]]
+
+        # Moving a cone of the array updates its positions:
+        positions = ca.positions
+        ca[1].position = Coordinate(7, 8)
+        assert ca.positions is not positions
+        assert ca.positions.tolist() == [[-1, -2], [7, 8], [5, 6]]
+        assert ca.indices_in_box(6, 8, 7, 9).tolist() == [1]
+
+        with pytest.raises(ValueError):
+            ca.positions[0, 0] = 0
+
+    def test_select(self) -> None:
+        """Test mask selection."""
+        cones = [Cone(Coordinate(i, -i), "blue") for i in range(4)]
+        ca = ConeArray(*cones)
+
+        selection = ca.select(np.array([True, False, True, False]))
+
+        assert selection.cones == (cones[0], cones[2])
+        assert selection.positions.tolist() == [[0, 0], [2, -2]]
+        assert selection.kind == ConeType.BLUE
+        assert len(ca.select([False] * 4)) == 0
+
+        selection.append(Cone(Coordinate(5, 5), "blue"))
+        assert len(ca) == 4
+        assert selection.positions.tolist()[-1] == [5, 5]
+
+        with pytest.raises(ValueError):
+            selection.positions[0, 0] = 1
+
+        with pytest.raises(ValueError):
+            ca.select([True, False])
+
+    def test_indices_in_box(self) -> None:
+        """Test axis-aligned box queries."""
+        rng = np.random.default_rng(0)
+        positions = rng.uniform(-20, 20, (500, 2))
+        ca = ConeArray(*[Cone(Coordinate(x, y), "blue") for x, y in positions])
+        xs, ys = ca.positions.T
+
+        for box in ((-5, 5, -5, 5), (2, 13, -20, 0), (-30, 30, -30, 30)):
+            x_low, x_high, y_low, y_high = box
+            expected = np.flatnonzero(
+                (xs >= x_low) & (xs <= x_high)
+                & (ys >= y_low) & (ys <= y_high)
+            )
+
+            assert sorted(ca.indices_in_box(*box)) == expected.tolist()
+
+        assert ca.indices_in_box(5, -5, -5, 5).tolist() == []
+        assert ca.indices_in_box(-5, 5, 5, -5).tolist() == []
+        assert ca.indices_in_box(30, 40, 30, 40).tolist() == []
+
+        # An explicit cell size keeps the grid between boxes of any size:
+        expected = np.flatnonzero(
+            (xs >= -5) & (xs <= 5) & (ys >= 1) & (ys <= 2)
+        )
+        assert sorted(ca.indices_in_box(-5, 5, 1, 2, cell=3)) == (
+            expected.tolist()
+        )
+        grid = ca._grid
+        ca.indices_in_box(-4.1, 7.3, -2, 9, cell=3)
+        assert ca._grid is grid
+
+        ca = ConeArray(*[
+            Cone(Coordinate(x, 0), "blue") for x in (3, -1, 4, 1, 5, 9, 2, 6)
+        ])
+        assert ca.indices_in_box(2, 5, 0, 0).tolist() == [6, 0, 2, 4]
+        assert ca.indices_in_box(1, 1, -1, 1).tolist() == [3]
+
+        # The index is rebuilt after the array changes:
+        ca.append(Cone(Coordinate(2.5, 0), "blue"))
+        assert sorted(ca.indices_in_box(2, 3, -1, 1)) == [0, 6, 8]
+
+        ca[0] = Cone(Coordinate(7, 0), "blue")
+        assert sorted(ca.indices_in_box(2, 3, -1, 1)) == [6, 8]
+
     def test_properties(self) -> None:
         """Test class properties."""
         ca = ConeArray(self.C1)
@@ -361,6 +503,18 @@ class TestConeArray:
         ConeArray(self.C3).plot(detail=True)
         ConeArray(self.C4).plot(detail=True)
 
+        # One collection per layer:
+        _, ax = plt.subplots()
+        ConeArray(self.C1, self.C1).plot(ax=ax, detail=False)
+        assert len(ax.collections) == 1
+
+        ConeArray(self.C1, self.C1).plot(ax=ax, detail=True)
+        assert len(ax.collections) == 7
+
+        ConeArray().plot(ax=ax)
+        assert len(ax.collections) == 7
+        plt.close(ax.figure)
+
     def test_len(self) -> None:
         """Test length method."""
         ca1 = ConeArray(self.C1)
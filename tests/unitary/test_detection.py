@@ -0,0 +1,362 @@
+"""Testing suites for the detection module.
+
+Author:
+    Paulo Sanchez (@erlete)
+"""
+
+from math import pi
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from bidimensional import Coordinate
+from bidimensional.polygons import Triangle
+
+from fs_mapping_tools import Camera, Cone, ConeArray
+
+
+class TestCamera:
+    """Testing suite for the Camera class."""
+
+    CAMERA = Camera(Coordinate(1, -1), pi / 4, pi / 2, 10)
+    RNG = np.random.default_rng(0)
+    CONES = ConeArray(*[
+        Cone(Coordinate(x, y), "yellow")
+        for x, y in RNG.uniform(-15, 15, (500, 2))
+    ])
+
+    @staticmethod
+    def reference(camera: Camera, cone: Cone) -> bool:
+        """Check whether a cone is detected, using triangle containment."""
+        position = camera.position
+        orientation, fov = camera.orientation, camera.fov
+        detection_range = camera.detection_range
+
+        vertices = [
+            position + Coordinate(
+                np.cos(angle) * detection_range,
+                np.sin(angle) * detection_range
+            ) for angle in (
+                orientation - fov / 2, orientation + fov / 2, orientation
+            )
+        ]
+
+        return (
+            cone.position in Triangle(position, vertices[0], vertices[1])
+            or cone.position in Triangle(*vertices)
+        )
+
+    def test_contains(self) -> None:
+        """Test single cone containment."""
+        assert Cone(Coordinate(2, 0), "blue") in self.CAMERA
+        assert Cone(Coordinate(1, -1), "blue") in self.CAMERA
+        assert Cone(Coordinate(0, -2), "blue") not in self.CAMERA
+        assert Cone(Coordinate(20, 20), "blue") not in self.CAMERA
+
+        for cone in self.CONES[:50]:
+            assert (cone in self.CAMERA) == self.reference(self.CAMERA, cone)
+
+        with pytest.raises(TypeError):
+            Coordinate(0, 0) in self.CAMERA
+
+    def test_mask(self) -> None:
+        """Test cone array containment mask."""
+        mask = self.CAMERA.mask(self.CONES)
+
+        assert mask.shape == (len(self.CONES),)
+        assert mask.any() and not mask.all()
+        assert mask.tolist() == [
+            self.reference(self.CAMERA, cone) for cone in self.CONES
+        ]
+
+        assert not Camera().mask(self.CONES).any()
+
+        with pytest.raises(TypeError):
+            self.CAMERA.mask(list(self.CONES))
+
+    def test_masks(self) -> None:
+        """Test cone array containment masks of several cameras."""
+        cameras = [
+            self.CAMERA,
+            Camera(Coordinate(-3, 2), pi, pi / 3, 12),
+            Camera()
+        ]
+        masks = Camera.masks(cameras, self.CONES)
+
+        assert masks.shape == (3, len(self.CONES))
+
+        for mask, camera in zip(masks, cameras):
+            assert mask.tolist() == camera.mask(self.CONES).tolist()
+
+        assert Camera.masks([], self.CONES).shape == (0, len(self.CONES))
+
+        with pytest.raises(TypeError):
+            Camera.masks([self.CAMERA, None], self.CONES)
+
+        with pytest.raises(TypeError):
+            Camera.masks(cameras, list(self.CONES))
+
+    def test_mask_sparse(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test containment of positions mostly out of range."""
+        cones = ConeArray(*[
+            Cone(Coordinate(x, y), "blue")
+            for x, y in self.RNG.uniform(-60, 60, (2000, 2))
+        ])
+        reference = [self.reference(self.CAMERA, cone) for cone in cones]
+
+        assert 0 < sum(reference) < len(cones) * self.CAMERA._SPARSE
+        assert self.CAMERA.mask(cones).tolist() == reference
+        assert [cone in self.CAMERA for cone in cones] == reference
+
+        # Spatial index of large arrays, which is reused while the camera
+        # moves:
+        monkeypatch.setattr(Camera, "_INDEXED", 0)
+        assert self.CAMERA.mask(cones).tolist() == reference
+
+        camera = Camera(Coordinate(1, -1), pi / 4, pi / 2, 10)
+        camera.mask(cones)
+        grid = cones._grid
+
+        for x, y in self.RNG.uniform(-50, 50, (10, 2)):
+            camera.position = Coordinate(x, y)
+            assert camera.mask(cones).tolist() == [
+                self.reference(camera, cone) for cone in cones
+            ]
+            assert cones._grid is grid
+
+        # Cones next to the range are never rejected by it:
+        boundary = ConeArray(*[
+            Cone(Coordinate(1 + r * np.cos(angle), -1 + r * np.sin(angle)),
+                 "blue")
+            for angle, r in (
+                (1e-3, 9.99), (pi / 4, 9.999), (pi / 2 - 1e-3, 9.99)
+            )
+        ])
+        assert self.CAMERA.mask(boundary).all()
+        assert all(cone in self.CAMERA for cone in boundary)
+
+    def test_mask_far(self) -> None:
+        """Test containment far from the origin."""
+        camera = Camera(Coordinate(1e6 + 0.3, -1e6), pi / 4, pi / 2, 10)
+        cones = ConeArray(*(
+            Cone(Coordinate(1e6 + x, -1e6 + y), "blue")
+            for x, y in self.RNG.uniform(-12, 12, (5000, 2))
+        ))
+
+        assert camera.mask(cones).tolist() == [
+            cone in camera for cone in cones
+        ]
+
+    def test_mask_blocks(self) -> None:
+        """Test containment of more positions than a block."""
+        positions = self.RNG.uniform(-15, 15, (40000, 2)).astype(np.float32)
+        mask = self.CAMERA._contains(positions)
+
+        assert mask.shape == (40000,)
+        assert mask.tolist() == np.concatenate([
+            self.CAMERA._contains(part)
+            for part in np.array_split(positions, 8)
+        ]).tolist()
+
+    def test_properties(self) -> None:
+        """Test detection area updates on property changes."""
+        camera = Camera(Coordinate(1, -1), pi / 4, pi / 2, 10)
+
+        camera.position = Coordinate(-3, 2)
+        camera.orientation = pi
+        camera.fov = pi / 3
+        camera.detection_range = 12
+
+        assert camera.mask(self.CONES).tolist() == [
+            self.reference(camera, cone) for cone in self.CONES
+        ]
+
+        with pytest.raises(TypeError):
+            camera.position = (0, 0)
+
+        with pytest.raises(TypeError):
+            camera.orientation = "0"
+
+        camera.orientation = np.float32(1)
+        camera.detection_range = np.int64(5)
+        assert isinstance(camera.orientation, float)
+        assert type(camera.detection_range) is float
+        assert camera.detection_range == 5
+
+    def test_wide_fov(self) -> None:
+        """Test containment for fields of view of pi and wider."""
+        for fov in (pi, 3 * pi / 2):
+            camera = Camera(Coordinate(1, -1), pi / 4, fov, 10)
+            reference = [self.reference(camera, cone) for cone in self.CONES]
+
+            assert camera.mask(self.CONES).tolist() == reference
+            assert [cone in camera for cone in self.CONES] == reference
+
+    def test_configure(self) -> None:
+        """Test setting several properties at once."""
+        camera = Camera(Coordinate(1, -1), pi / 4, pi / 2, 10)
+        camera.configure(
+            position=Coordinate(-3, 2), orientation=pi, detection_range=12
+        )
+
+        assert camera.fov == pi / 2
+        assert camera.detection_range == 12
+        assert camera.mask(self.CONES).tolist() == [
+            self.reference(camera, cone) for cone in self.CONES
+        ]
+
+        # Setting the same values again keeps the previous detections:
+        camera.detect(self.CONES)
+        detected = camera.detected
+        camera.configure(
+            position=Coordinate(-3, 2), orientation=pi, fov=pi / 2,
+            detection_range=12
+        )
+        camera.detect(self.CONES)
+        assert camera.detected is detected
+
+        with pytest.raises(TypeError):
+            camera.configure(fov="0")
+
+        with pytest.raises(TypeError):
+            camera.configure(Coordinate(0, 0))
+
+    def test_detection_area(self) -> None:
+        """Test detection area triangles."""
+        camera = Camera(Coordinate(1, -1), pi / 4, pi / 2, 10)
+        area = camera.detection_area
+
+        assert len(area) == 2
+        assert all(isinstance(triangle, Triangle) for triangle in area)
+        assert camera.detection_area is area
+        assert Coordinate(1, -1) in area[0]
+
+        camera.position = Coordinate(0, 0)
+        assert camera.detection_area is not area
+        assert Coordinate(1, -1) not in camera.detection_area[0]
+
+        area = camera.detection_area
+        camera.fov = pi / 3
+        assert camera.detection_area is not area
+
+        assert Camera().detection_area == ()
+
+    def test_outline(self) -> None:
+        """Test detection area outline."""
+        camera = Camera(Coordinate(1, -1), pi / 4, pi / 2, 10)
+
+        assert camera.outline.ravel().tolist() == pytest.approx([
+            1, -1,
+            11, -1,
+            1 + 10 * np.cos(pi / 4), -1 + 10 * np.sin(pi / 4),
+            1, 9
+        ])
+
+        camera.configure(position=Coordinate(0, 0), detection_range=1)
+        assert camera.outline.ravel().tolist() == pytest.approx([
+            0, 0, 1, 0, np.cos(pi / 4), np.sin(pi / 4), 0, 1
+        ])
+
+        # Wide fields of view leave the position of the camera inside:
+        camera.configure(orientation=0, fov=1.5 * pi, detection_range=10)
+        half = 10 * np.cos(pi / 4)
+        assert camera.outline.ravel().tolist() == pytest.approx([
+            -half, -half, 10, 0, -half, half
+        ])
+
+    def test_detect(self) -> None:
+        """Test cone detection."""
+        camera = Camera(Coordinate(1, -1), pi / 4, pi / 2, 10)
+        blue = ConeArray(
+            Cone(Coordinate(2, 0), "blue"),
+            Cone(Coordinate(0, -2), "blue")
+        )
+
+        assert camera.detected == []
+
+        camera.detect()
+        assert camera.detected == []
+
+        camera.detect(self.CONES, blue)
+        assert len(camera.detected) == 2
+        assert camera.detected[0].cones == tuple(
+            cone for cone in self.CONES if self.reference(camera, cone)
+        )
+        assert camera.detected[1].cones == (blue[0],)
+
+        # Unchanged inputs keep the previous detection:
+        detected = camera.detected
+        camera.detect(self.CONES, blue)
+        assert camera.detected is detected
+
+        blue.append(Cone(Coordinate(3, 1), "blue"))
+        camera.detect(self.CONES, blue)
+        assert camera.detected is not detected
+        assert camera.detected[1].cones == (blue[0], blue[2])
+
+        detected = camera.detected
+        camera.position = Coordinate(0, -2)
+        camera.detect(self.CONES, blue)
+        assert camera.detected is not detected
+        assert camera.detected[1].cones == blue.cones
+
+        detected = camera.detected
+        camera.orientation = pi
+        camera.detect(self.CONES, blue)
+        assert camera.detected is not detected
+        assert camera.detected[1].cones == (blue[1],)
+
+        camera.detect(blue, self.CONES)
+        assert camera.detected[0].cones == (blue[1],)
+
+        # Moving a cone of an array also updates the detection:
+        blue[0].position = Coordinate(-3, -2)
+        assert camera.mask(blue).tolist() == [True, True, False]
+        camera.detect(blue, self.CONES)
+        assert camera.detected[0].cones == (blue[0], blue[1])
+
+        with pytest.raises(TypeError):
+            camera.detect(self.CONES, list(blue))
+
+        with pytest.raises(TypeError):
+            camera.detect(list(blue))
+
+    def test_plot(self) -> None:
+        """Test plot method."""
+        _, ax = plt.subplots()
+
+        self.CAMERA.plot(ax=ax)
+        assert len(ax.patches) == 1 and len(ax.lines) == 1
+        assert ax.patches[0].get_rasterized()
+        assert ax.patches[0].get_alpha() == 0.2
+        assert ax.patches[0].get_xy()[:4].ravel().tolist() == pytest.approx([
+            1, -1,
+            11, -1,
+            1 + 10 * np.cos(pi / 4), -1 + 10 * np.sin(pi / 4),
+            1, 9
+        ])
+
+        ax.cla()
+        self.CAMERA.plot(ax=ax, rasterized=False, color="red", alpha=0.5)
+        assert not ax.patches[0].get_rasterized()
+        assert ax.patches[0].get_alpha() == 0.5
+
+        # Line-only keyword arguments are not passed to the area fill:
+        ax.cla()
+        self.CAMERA.plot(ax=ax, ms=4, mec="k", color="red")
+        assert len(ax.patches) == 1 and ax.lines[0].get_markersize() == 4
+        assert ax.patches[0].get_facecolor()[:3] == (1, 0, 0)
+
+        # Wide detection areas are filled whole:
+        ax.cla()
+        camera = Camera(Coordinate(0, 0), 0, 1.5 * pi, 10)
+        camera.plot(ax=ax)
+        assert Cone(Coordinate(-3, 0), "blue") in camera
+        assert ax.patches[0].get_path().contains_point((-3, 0))
+
+        # Degenerate detection areas are skipped:
+        ax.cla()
+        Camera().plot(ax=ax)
+        assert not ax.patches and len(ax.lines) == 1
+
+        plt.close(ax.figure)
@@ -0,0 +1,51 @@
+"""Testing suites for the dynamics module.
+
+Author:
+    Paulo Sanchez (@erlete)
+"""
+
+from math import pi
+
+import numpy as np
+import pytest
+from bidimensional import Coordinate
+
+from fs_mapping_tools import STATE_DTYPE, State
+from fs_mapping_tools.vehicle.dynamics import step
+
+
+class TestDynamics:
+    """Testing suite for the dynamics utilities."""
+
+    def test_record(self) -> None:
+        """Test state record conversion."""
+        record = State(Coordinate(1, 2), 0.5, 0.1, 3, 4, 5).as_record()
+
+        assert record.dtype == STATE_DTYPE
+        assert record.item() == (1, 2, 0.5, 0.1, 3, 4, 5)
+
+    def test_step(self) -> None:
+        """Test kinematic state integration."""
+        states = np.zeros(3, dtype=STATE_DTYPE)
+        states["orientation"] = (0, pi / 2, 0)
+        states["steering"] = (0, 0, pi / 8)
+        states["speed"] = 2
+        states["acceleration"] = 1
+
+        for _ in range(1000):
+            step(
+                states["x"], states["y"], states["orientation"],
+                states["steering"], states["speed"], states["acceleration"],
+                1.5, 1e-3
+            )
+
+        # Straight motion: x = v0 * t + a * t^2 / 2.
+        assert states["x"][0] == pytest.approx(2.5, abs=1e-2)
+        assert states["y"][0] == 0
+        assert states["y"][1] == pytest.approx(2.5, abs=1e-2)
+        assert states["speed"].tolist() == pytest.approx([3, 3, 3])
+
+        # Turning motion: orientation rate is v * tan(steering) / wheelbase.
+        assert states["orientation"][2] == pytest.approx(
+            2.5 * np.tan(pi / 8) / 1.5, abs=1e-2
+        )
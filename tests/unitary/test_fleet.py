@@ -0,0 +1,363 @@
+"""Testing suites for the fleet module.
+
+Author:
+    Paulo Sanchez (@erlete)
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from bidimensional import Coordinate
+
+from fs_mapping_tools import (STATE_DTYPE, Car, CarFleet, CarHandle,
+                              CarStateView, Engine, PositionView, State)
+from fs_mapping_tools.vehicle.dynamics import step
+
+
+class TestCarFleet:
+    """Testing suite for the CarFleet class."""
+
+    @staticmethod
+    def cars():
+        """Get a list of cars with different states."""
+        structure = Car.fsuk_adsdv_camera().structure
+
+        return [
+            Car(State(Coordinate(i, -i), i / 10, 0.1, 2 * i, 1, 3), structure)
+            for i in range(5)
+        ]
+
+    def test_init(self) -> None:
+        """Test fleet initialization."""
+        fleet = CarFleet(3)
+
+        assert len(fleet) == 3
+        assert fleet.speed.tolist() == [0, 0, 0]
+        assert fleet.structures == [None] * 3
+        assert len(CarFleet(0)) == 0
+        assert len(CarFleet(np.int64(2))) == 2
+        assert fleet.dtype == np.float64
+
+        fleet = CarFleet(3, np.float32)
+        assert fleet.dtype == fleet.torque.dtype == np.float32
+
+        for column in fleet.columns().values():
+            assert column.ctypes.data % 64 == 0
+            assert column.shape == (3,) and column.flags.c_contiguous
+
+        with pytest.raises(TypeError):
+            CarFleet(3.0)
+
+        with pytest.raises(TypeError):
+            CarFleet(3, int)
+
+        with pytest.raises(ValueError):
+            CarFleet(-1)
+
+    def test_from_cars(self) -> None:
+        """Test fleet construction from cars."""
+        cars = self.cars()
+        fleet = CarFleet.from_cars(cars)
+
+        assert len(fleet) == 5
+        assert fleet.position_x.tolist() == [0, 1, 2, 3, 4]
+        assert fleet.position_y.tolist() == [0, -1, -2, -3, -4]
+        assert fleet.speed.tolist() == [0, 2, 4, 6, 8]
+        assert fleet.structures[0] is cars[0].structure
+
+        fleet = CarFleet.from_cars(cars, dtype=np.float32)
+        assert fleet.orientation.dtype == np.float32
+        assert fleet.orientation.tolist() == pytest.approx(
+            [0, 0.1, 0.2, 0.3, 0.4]
+        )
+
+        assert fleet.wheelbase.tolist() == pytest.approx([1.53] * 5)
+        assert fleet.front_track.tolist() == pytest.approx([1.201] * 5)
+        assert fleet.front_max_steering.tolist() == pytest.approx(
+            [np.deg2rad(27.2)] * 5
+        )
+        assert fleet.rear_max_steering.tolist() == [0] * 5
+
+        with pytest.raises(TypeError):
+            CarFleet.from_cars([State()])
+
+    def test_from_arrays(self) -> None:
+        """Test fleet construction from arrays."""
+        fleet = CarFleet.from_arrays(
+            np.arange(4), [0, -1, -2, -3], speed=np.full(4, 2), wheelbase=1.5
+        )
+
+        assert len(fleet) == 4
+        assert fleet.position_y.tolist() == [0, -1, -2, -3]
+        assert fleet.speed.tolist() == [2] * 4
+        assert fleet.wheelbase.tolist() == [1.5] * 4
+        assert fleet.torque.tolist() == [0] * 4
+        assert fleet.structures == [None] * 4
+
+        fleet = CarFleet.from_arrays([1.5], [2], dtype=np.float32)
+        assert fleet.dtype == np.float32
+
+        with pytest.raises(TypeError):
+            CarFleet.from_arrays([0], [0], velocity=[1])
+
+        with pytest.raises(ValueError):
+            CarFleet.from_arrays([0, 1], [0, 1, 2])
+
+    def test_to_cars(self) -> None:
+        """Test fleet conversion to cars."""
+        cars = self.cars()
+        fleet = CarFleet.from_cars(cars)
+        fleet.speed *= 2
+
+        for car, new in zip(cars, fleet.to_cars()):
+            assert new.state.position == car.state.position
+            assert new.state.speed == 2 * car.state.speed
+            assert new.state.torque == car.state.torque
+            assert new.structure is car.structure
+
+    def test_columns(self) -> None:
+        """Test state column access."""
+        fleet = CarFleet.from_cars(self.cars())
+        columns = fleet.columns()
+
+        assert tuple(columns) == STATE_DTYPE.names
+        assert columns["x"] is fleet.position_x
+        assert columns["torque"] is fleet.torque
+        assert np.from_dlpack(columns["speed"]).tolist() == [0, 2, 4, 6, 8]
+
+    def test_records(self) -> None:
+        """Test record array conversion."""
+        cars = self.cars()
+        fleet = CarFleet.from_cars(cars)
+        records = fleet.to_records()
+
+        assert records.dtype == STATE_DTYPE
+        assert records.tolist() == [
+            car.state.as_record().item() for car in cars
+        ]
+
+        records["speed"] += 1
+        assert fleet.speed[0] == 0
+
+        fleet.load_records(records)
+        assert fleet.speed.tolist() == [1, 3, 5, 7, 9]
+
+        with pytest.raises(TypeError):
+            fleet.load_records(records.tolist())
+
+        with pytest.raises(TypeError):
+            fleet.load_records(records[["x", "y"]])
+
+        with pytest.raises(ValueError):
+            fleet.load_records(records[1:])
+
+    def test_wheel_diameters(self) -> None:
+        """Test wheel diameters."""
+        fleet = CarFleet.from_cars(self.cars())
+        fleet.rear_right_diameter[1] = 0.6
+
+        diameters = fleet.wheel_diameters()
+
+        assert diameters.shape == (5, 4)
+        assert diameters[0].tolist() == pytest.approx([0.513] * 4)
+        assert diameters[1, 3] == 0.6
+        assert CarFleet(0).wheel_diameters().shape == (0, 4)
+
+    def test_clamp_to_engine(self) -> None:
+        """Test state clamping to engine ranges."""
+        fleet = CarFleet.from_arrays(
+            np.zeros(3), np.zeros(3), speed=[-1, 5, 20],
+            acceleration=[-5, 0, 5], torque=[50, 150, 250]
+        )
+        speed = fleet.speed
+
+        fleet.clamp_to_engine(Engine((0, 10), (-2, 2), (100, 200)))
+
+        assert fleet.speed is speed
+        assert fleet.speed.tolist() == [0, 5, 10]
+        assert fleet.acceleration.tolist() == [-2, 0, 2]
+        assert fleet.torque.tolist() == [100, 150, 200]
+
+        with pytest.raises(TypeError):
+            fleet.clamp_to_engine((0, 10))
+
+    def test_step(self) -> None:
+        """Test state integration."""
+        cars = self.cars()
+        fleet = CarFleet.from_cars(cars)
+        speed = fleet.speed
+
+        records = np.array(
+            [car.state.as_record() for car in cars], dtype=STATE_DTYPE
+        )
+
+        for _ in range(10):
+            fleet.step(0.1)
+            step(
+                records["x"], records["y"], records["orientation"],
+                records["steering"], records["speed"],
+                records["acceleration"], 1.53, 0.1
+            )
+
+        assert fleet.speed is speed
+        assert fleet.position_x.tolist() == records["x"].tolist()
+        assert fleet.position_y.tolist() == records["y"].tolist()
+        assert fleet.orientation.tolist() == records["orientation"].tolist()
+        assert fleet.speed.tolist() == pytest.approx([1, 3, 5, 7, 9])
+
+        # Fleets without wheelbases cannot be stepped:
+        with pytest.raises(ValueError):
+            CarFleet.from_arrays([0, 1], [0, 0], speed=1).step(0.1)
+
+        fleet.wheelbase[2] = np.nan
+
+        with pytest.raises(ValueError):
+            fleet.step(0.1)
+
+    def test_step_blocks(self) -> None:
+        """Test state integration of fleets larger than a block."""
+        n = 2 * CarFleet.BLOCK_SIZE + 1
+        fleet = CarFleet(n)
+        fleet.wheelbase[:] = 1.5
+        fleet.steering[:] = np.linspace(-0.5, 0.5, n)
+        fleet.speed[:] = 3
+
+        records = fleet.to_records()
+        fleet.step(0.1)
+        step(
+            records["x"], records["y"], records["orientation"],
+            records["steering"], records["speed"], records["acceleration"],
+            1.5, 0.1
+        )
+
+        assert (fleet.position_x == records["x"]).all()
+        assert (fleet.orientation == records["orientation"]).all()
+
+
+class TestCarHandle:
+    """Testing suite for the CarHandle class."""
+
+    def test_access(self) -> None:
+        """Test car access."""
+        cars = TestCarFleet.cars()
+        fleet = CarFleet.from_cars(cars)
+        car = fleet[-2]
+
+        assert isinstance(car, CarHandle)
+        assert car.index == 3
+        assert car.state is car.state
+        assert car.state.speed == 6
+        assert car.structure is cars[3].structure
+
+        car.state.speed = 1
+        assert fleet.speed[3] == 1
+        assert [car.index for car in fleet] == [0, 1, 2, 3, 4]
+
+        with pytest.raises(IndexError):
+            fleet[5]
+
+        with pytest.raises(TypeError):
+            fleet[1:]
+
+    def test_plot(self) -> None:
+        """Test plot method."""
+        cars = TestCarFleet.cars()
+        fleet = CarFleet.from_cars(cars)
+        _, (ax, reference) = plt.subplots(1, 2)
+
+        fleet[3].plot(ax=ax, color="red")
+        cars[3].plot(ax=reference, color="red")
+
+        assert len(ax.lines) == len(reference.lines)
+        assert all(
+            np.allclose(line.get_xydata(), expected.get_xydata())
+            for line, expected in zip(ax.lines, reference.lines)
+        )
+        assert fleet[0].kmh_to_ms(36) == Car.kmh_to_ms(36)
+
+        with pytest.raises(ValueError):
+            CarFleet(1)[0].plot(ax=ax)
+
+        plt.close(ax.figure)
+
+
+class TestCarStateView:
+    """Testing suite for the CarStateView class."""
+
+    def test_access(self) -> None:
+        """Test state field access."""
+        fleet = CarFleet.from_cars(TestCarFleet.cars())
+        state = fleet.state(2)
+
+        assert isinstance(state, CarStateView)
+        assert state.position.as_coordinate() == Coordinate(2, -2)
+        assert state.orientation == 0.2
+        assert state.speed == 4
+        assert fleet.state(-1).speed == 8
+
+        state.speed = 10
+        state.position = Coordinate(5, 6)
+        assert fleet.speed[2] == 10
+        assert fleet.position_x[2] == 5 and fleet.position_y[2] == 6
+
+        fleet.steering[:] = np.arange(5)
+        assert state.steering == 2
+
+        with pytest.raises(AttributeError):
+            state.wheelbase
+
+        with pytest.raises(AttributeError):
+            state.wheelbase = 1
+
+        state.position = fleet.state(0).position
+        assert state.position.as_coordinate() == Coordinate(0, 0)
+
+        with pytest.raises(TypeError):
+            state.position = (0, 0)
+
+    def test_position(self) -> None:
+        """Test position view access."""
+        fleet = CarFleet.from_cars(TestCarFleet.cars())
+        position = fleet.state(3).position
+
+        assert isinstance(position, PositionView)
+        assert (position.x, position.y) == (3, -3)
+
+        position.x = 7
+        position.y += 1
+        assert fleet.position_x[3] == 7 and fleet.position_y[3] == -2
+
+        fleet.position_x += 1
+        assert position.x == 8
+
+    def test_state_interface(self) -> None:
+        """Test State members of the view."""
+        cars = TestCarFleet.cars()
+        fleet = CarFleet.from_cars(cars)
+        state = fleet.state(2)
+
+        assert state.direction == pytest.approx(cars[2].state.direction)
+        assert state.as_record() == cars[2].state.as_record()
+
+        state.orientation = 0
+        assert state.direction == (1, 0)
+        assert state.as_record()["orientation"] == 0
+
+    def test_index(self) -> None:
+        """Test index validation."""
+        fleet = CarFleet(2)
+        fleet.speed[1] = 3
+
+        # NumPy integers, such as those of index arrays, are valid:
+        index = np.flatnonzero(fleet.speed)[0]
+        assert fleet.state(index).speed == 3
+        assert fleet[index].index == 1 and type(fleet[index].index) is int
+
+        with pytest.raises(TypeError):
+            fleet.state(0.0)
+
+        with pytest.raises(IndexError):
+            fleet.state(2)
+
+        with pytest.raises(IndexError):
+            fleet.state(-3)